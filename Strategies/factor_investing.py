@@ -1,132 +1,231 @@
-import time
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from portfolio.metrics import performance_metrics
 
 
 class factor_investing_screener:
 
+    # yfinance .info key -> screen column
+    FEATURES = {
+        'priceToBook': 'p_b',
+        'trailingPE': 'pe_ttm',
+        'forwardPE': 'pe_forward',
+        'enterpriseToEbitda': 'ev_ebitda',
+        'debtToEquity': 'debt_to_equity',
+        'returnOnEquity': 'roe',
+        'returnOnAssets': 'roa',
+        'grossMargins': 'gross_margin',
+        'operatingMargins': 'operating_margin',
+        'freeCashflow': 'fcf',
+        'revenueGrowth': 'revenue_growth',
+        'earningsGrowth': 'earnings_growth',
+        'beta': 'beta',
+        'marketCap': 'market_cap'
+    }
+
+    # Ranked screen column -> True when lower is better
+    RANK_ASCENDING = {
+        'p_b': True,
+        'pe_ttm': True,
+        'pe_forward': True,
+        'ev_ebitda': True,
+        'roe': False,
+        'roa': False,
+        'gross_margin': False,
+        'operating_margin': False,
+        'revenue_growth': False,
+        'earnings_growth': False
+    }
+
     def __init__(self, data_loader, tickers):
         self.loader = data_loader
         self.tickers = tickers
-        self.passed = []
-
-    def _get_features(self):
-        for ticker in self.tickers:
-            info = self.loader.get_fundamentals(ticker)
-            # Check all required keys exist
-            required_keys = [
-                'priceToBook', 'trailingPE', 'forwardPE', 'enterpriseToEbitda',
-                'debtToEquity', 'returnOnEquity', 'returnOnAssets', 'grossMargins',
-                'operatingMargins', 'freeCashflow', 'revenueGrowth', 'earningsGrowth',
-                'beta', 'marketCap'
-            ]
-
-            missing_keys = [k for k in required_keys if k not in info or info[k] is None]
-            if missing_keys:
-                print(f"[!] Skipping {ticker} — missing keys: {missing_keys}")
-                continue
-
-
-            if all(k in info and info[k] is not None for k in required_keys):
-                self.passed.append({
-                    'ticker': ticker,
-                    'p_b': info['priceToBook'],
-                    'pe_ttm': info['trailingPE'],
-                    'pe_forward': info['forwardPE'],
-                    'ev_ebitda': info['enterpriseToEbitda'],
-                    'debt_to_equity': info['debtToEquity'],
-                    'roe': info['returnOnEquity'],
-                    'roa': info['returnOnAssets'],
-                    'gross_margin': info['grossMargins'],
-                    'operating_margin': info['operatingMargins'],
-                    'fcf': info['freeCashflow'],
-                    'revenue_growth': info['revenueGrowth'],
-                    'earnings_growth': info['earningsGrowth'],
-                    'beta': info['beta'],
-                    'market_cap': info['marketCap']
-                })
-            time.sleep(0.2)  # avoid hitting API rate limits
+        self.passed = pd.DataFrame()
+
+    def _get_features(self, as_of=None):
+        # Point-in-time fundamentals for every ticker from the snapshot table in one read
+        snapshot = self.loader.get_fundamentals_snapshot(self.tickers, as_of=as_of)
+
+        # Tickers missing any required key are dropped
+        required_keys = list(self.FEATURES)
+        df = snapshot.reindex(columns=required_keys)
+
+        missing = df.isna()
+        no_snapshot = snapshot['Date'].isna() if 'Date' in snapshot else pd.Series(True, index=snapshot.index)
+        if no_snapshot.any():
+            when = f" on or before {pd.Timestamp(as_of):%Y-%m-%d}" if as_of is not None else ""
+            print(f"[!] Skipping {int(no_snapshot.sum())} tickers with no fundamentals snapshot{when}")
+        for ticker in df.index[missing.any(axis=1) & ~no_snapshot.to_numpy()]:
+            missing_keys = [k for k in required_keys if missing.at[ticker, k]]
+            print(f"[!] Skipping {ticker} — missing keys: {missing_keys}")
+
+        df = df[~missing.any(axis=1)].rename(columns=self.FEATURES)
+        df = df[~df.index.duplicated()]
+        df.index.name = 'ticker'
+        self.passed = df.reset_index()
         return self.passed 
     
-    def choose_stocks(self, top_n=10):
-        self._get_features()
-        df = pd.DataFrame(self.passed)
+    def choose_stocks(self, top_n=10, as_of=None):
+        df = self._get_features(as_of).copy()
 
         if df.empty:
             raise ValueError("No data available to screen.")
 
-        # Invert value metrics: lower is better
-        df['p_b_rank'] = df['p_b'].rank(ascending=True)
-        df['pe_ttm_rank'] = df['pe_ttm'].rank(ascending=True)
-        df['pe_forward_rank'] = df['pe_forward'].rank(ascending=True)
-        df['ev_ebitda_rank'] = df['ev_ebitda'].rank(ascending=True)
-
-        # Quality metrics: higher is better
-        df['roe_rank'] = df['roe'].rank(ascending=False)
-        df['roa_rank'] = df['roa'].rank(ascending=False)
-        df['gross_margin_rank'] = df['gross_margin'].rank(ascending=False)
-        df['operating_margin_rank'] = df['operating_margin'].rank(ascending=False)
-
-        # Growth metrics: higher is better
-        df['revenue_growth_rank'] = df['revenue_growth'].rank(ascending=False)
-        df['earnings_growth_rank'] = df['earnings_growth'].rank(ascending=False)
+        # Value metrics: lower is better; quality and growth metrics: higher is better
+        for col, ascending in self.RANK_ASCENDING.items():
+            df[f'{col}_rank'] = df[col].rank(ascending=ascending)
 
         # Combine all ranks into a composite score (equal weighting for now)
-        df['composite_score'] = df[
-            [
-                'p_b_rank', 'pe_ttm_rank', 'pe_forward_rank', 'ev_ebitda_rank',
-                'roe_rank', 'roa_rank', 'gross_margin_rank', 'operating_margin_rank',
-                'revenue_growth_rank', 'earnings_growth_rank'
-            ]
-        ].mean(axis=1)
+        df['composite_score'] = df[[f'{col}_rank' for col in self.RANK_ASCENDING]].mean(axis=1)
 
         df_sorted = df.sort_values(by='composite_score')
         top_stocks = df_sorted.head(top_n).reset_index(drop=True)
 
         return top_stocks
-            
+
+    def composite_scores(self, dates) -> pd.DataFrame:
+        """
+        choose_stocks' composite score for several rebalance dates at once: the point-in-time
+        features of every (date, ticker) pair are ranked per date in one grouped matrix op.
+
+        :return: DataFrame of dates x tickers, lower is better; NaN where a ticker misses a key on that date.
+        """
+        dates = pd.DatetimeIndex(dates)
+        history = self.loader.get_fundamentals_history(self.tickers, dates.unique())
+        features = history.reindex(columns=list(self.FEATURES)).rename(columns=self.FEATURES).dropna()
+
+        # A descending rank of x is the ascending rank of -x, so one grouped rank covers every column
+        signs = np.where(list(self.RANK_ASCENDING.values()), 1.0, -1.0)
+        ranks = (features[list(self.RANK_ASCENDING)] * signs).groupby(level='Date').rank()
+        scores = ranks.mean(axis=1).unstack('Ticker')
+        return scores.reindex(index=dates, columns=list(dict.fromkeys(self.tickers)))
+
 
 class factor_investing_strategy():
 
-    def __init__(self, start_date, end_date, commission, data_loader, tickers):
+    def __init__(self, start_date, end_date, commission, data_loader, tickers, rebalance: str = 'QE', top_n: int = 3):
+        """
+        :param rebalance: Pandas offset alias of the rebalance schedule ('ME' monthly, 'QE' quarterly). None buys once and holds.
+        :param top_n: Number of stocks held after each screen.
+        """
         self.start_date = pd.to_datetime(start_date)
         self.end_date = pd.to_datetime(end_date)
         self.commission = commission / 100
+        self.rebalance = rebalance
+        self.top_n = top_n
         self.screener = factor_investing_screener(data_loader, tickers)
         self.loader = data_loader
         self.portfolio = []
         self.returns = []
 
     def get_stocks(self, date):
-        top_stocks = self.screener.choose_stocks(top_n=3)
+        # Screen on the fundamentals known at `date`; earlier dates use the first snapshot covering the universe
+        as_of = max(pd.Timestamp(date), self.universe_snapshot_date())
+        if as_of > pd.Timestamp(date):
+            print(f"[!] {pd.Timestamp(date):%Y-%m-%d} predates the fundamentals snapshots, screening on {as_of:%Y-%m-%d} instead.")
+        try:
+            top_stocks = self.screener.choose_stocks(top_n=self.top_n, as_of=as_of)
+        except ValueError:
+            print(f"[!] No fundamentals to screen on {as_of:%Y-%m-%d}, no stocks selected.")
+            return []
         return top_stocks['ticker'].tolist()
-    
-    def backtest(self):
-        tickers = self.get_stocks(self.start_date)
-        if not tickers:
+
+    def universe_snapshot_date(self):
+        """
+        Date by which every ticker of the universe that has fundamentals has its first snapshot.
+        Screening earlier dates on an older snapshot would only rank the few tickers it happens to cover.
+        """
+        start = self.loader.get_fundamentals_start(self.screener.tickers).dropna()
+        return start.max() if len(start) else pd.NaT
+
+    def get_rebalance_dates(self):
+        """
+        First business day of every rebalance period in [start_date, end_date] (only the start without a schedule).
+        """
+        days = pd.bdate_range(self.start_date, self.end_date)
+        if self.rebalance is None or days.empty:
+            return days[:1]
+        return pd.DatetimeIndex(days.to_series().resample(self.rebalance).first().dropna())
+
+    def get_stocks_history(self, dates):
+        """
+        Top stocks at every rebalance date, ranked on the fundamentals known at that date.
+        Dates older than universe_snapshot_date are screened on the fundamentals known at that date.
+
+        :return: Dict of date: list of tickers.
+        """
+        as_of = pd.DatetimeIndex(dates)
+        universe_date = self.universe_snapshot_date()
+        if pd.notna(universe_date) and as_of.min() < universe_date:
+            early = int((as_of < universe_date).sum())
+            print(f"[!] {early} rebalance dates predate the fundamentals snapshot of the whole universe ({universe_date:%Y-%m-%d}) and are screened on it.")
+            as_of = as_of.where(as_of >= universe_date, universe_date)
+
+        scores = self.screener.composite_scores(as_of)
+        order = np.argsort(scores.fillna(np.inf).to_numpy(), axis=1, kind='stable')[:, :self.top_n]
+        ranked = np.take_along_axis(scores.notna().to_numpy(), order, axis=1)
+        columns = scores.columns.to_numpy()
+        return {date: columns[row][ok].tolist() for date, row, ok in zip(dates, order, ranked)}
+
+    def backtest(self, tickers=None, prices=None):
+        """
+        Equal-weight basket of the top stocks, re-screened on point-in-time fundamentals at every
+        rebalance date. Holdings drift between rebalances and commission is charged on turnover.
+
+        :param tickers: Optional fixed tickers, only re-weighted at each rebalance; by default they are screened.
+        :param prices: Optional preloaded close panel (dates x tickers) to read the held tickers from instead of the loader.
+        """
+        dates = self.get_rebalance_dates()
+        picks = {d: list(tickers) for d in dates} if tickers is not None else self.get_stocks_history(dates)
+        held = sorted({t for p in picks.values() for t in p})
+        if not held:
             print(f"[!] No stocks selected at start date {self.start_date}.")
             return None
-        
-        data_dict = self.loader.get_multiple_data(tickers, start=self.start_date, end=self.end_date)
-        prices = pd.DataFrame({ticker: df['Close'] for ticker, df in data_dict.items() if 'Close' in df})
+
+        if prices is None:
+            prices = self.loader.get_close_panel(held, self.start_date, self.end_date)
+        prices = prices.reindex(columns=held).loc[self.start_date:self.end_date].dropna(how='all').ffill()
 
         if prices.empty:
             print("[!] No valid price data for the period.")
             return None
-        
-        prices = prices.dropna(axis=1, how='any')
-        if prices.shape[1] == 0:
+
+        # Trade each rebalance at the close of the first trading day on or after its date
+        rows = prices.index.searchsorted(dates)
+        keep = np.r_[rows[1:] != rows[:-1], True] & (rows < len(prices))
+        rows, dates = rows[keep], dates[keep]
+        base = prices.to_numpy()[rows]
+        selected = np.array([[t in picks[d] for t in held] for d in dates]) & ~np.isnan(base)
+        if not selected.any():
             print("[!] All stocks had missing data. Exiting.")
             return None
-        
-        rets = prices.pct_change().dropna()
-
-        pf_ret = rets.mean(axis=1) * (1-self.commission)
-
-        pf_cum = (1+pf_ret).cumprod()
-
+        counts = selected.sum(axis=1, keepdims=True)
+        weights = np.divide(selected, counts, out=np.zeros(selected.shape), where=counts > 0)
+
+        # Period k runs from rebalance k (exclusive) to rebalance k+1 (inclusive) with drifting holdings
+        px = prices.to_numpy()[rows[0]:]
+        prev_px = np.vstack([px[:1], px[:-1]])
+        period = np.maximum(np.searchsorted(rows - rows[0], np.arange(len(px)), side='left') - 1, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            value = np.nansum(weights[period] * px / base[period], axis=1)
+            prev_value = np.nansum(weights[period] * prev_px / base[period], axis=1)
+            returns = np.divide(value, prev_value, out=np.ones(len(px)), where=prev_value > 0) - 1
+
+            # Turnover: distance from the drifted weights to the new targets (the first buy is a full turnover)
+            grown = np.nan_to_num(weights[:-1] * base[1:] / base[:-1])
+        totals = grown.sum(axis=1, keepdims=True)
+        drifted = np.vstack([np.zeros((1, len(held))), np.divide(grown, totals, out=np.zeros(grown.shape), where=totals > 0)])
+        turnover = np.abs(weights - drifted).sum(axis=1)
+        trade_rows = rows - rows[0]
+        returns[trade_rows] = (1 + returns[trade_rows]) * (1 - self.commission * turnover) - 1
+
+        pf_ret = pd.Series(returns, index=prices.index[rows[0]:])
+        pf_cum = (1 + pf_ret).cumprod()
+
+        self.picks = dict(zip(prices.index[rows], (picks[d] for d in dates)))
+        self.turnover = pd.Series(turnover, index=prices.index[rows])
         self.returns = pf_ret
         self.portfolio = pf_cum
 
@@ -161,29 +260,9 @@ class factor_investing_strategy():
         if returns is None or returns.empty:
             return None
 
-        # Correct total return
-        total_return = (1 + returns).prod() - 1
-
-        # Annualized return (CAGR)
-        ann_ret = (1 + total_return) ** (12 / len(returns.resample('ME').mean())) - 1
-
-        # Annualized volatility
-        ann_vol = returns.std() * np.sqrt(252)  # Use 252 if using daily returns
-
-        # Sharpe ratio
-        sharpe = (ann_ret - risk_free_rate) / ann_vol if ann_vol != 0 else np.nan
-
-        # Max drawdown
-        cum_returns = self.portfolio
-        drawdown = cum_returns / cum_returns.cummax() - 1
-        max_dd = drawdown.min()
+        stats = performance_metrics(returns, periods_per_year=252, risk_free_rate=risk_free_rate).iloc[0]
 
-        metrics = {
-            'Return [%]': total_return * 100,
-            'CAGR [%]': ann_ret * 100,
-            'Sharpe Ratio': sharpe,
-            'Max. Drawdown [%]': max_dd * 100
-        }
+        metrics = {metric: stats[metric] for metric in ['Return [%]', 'CAGR [%]', 'Sharpe Ratio', 'Max. Drawdown [%]']}
 
         return metrics
 
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+
+class indicator_cache:
+    def __init__(self, maxsize: int = 512, cache_dir: str = None, disk_maxsize: int = 4096):
+        """
+        Caches indicator outputs keyed by (ticker, data fingerprint, indicator, params).
+
+        :param maxsize: Number of indicator results kept in the in-memory LRU.
+        :param cache_dir: Optional directory for on-disk persistence across runs and processes, e.g.
+                          "./data/store/indicators". None (the default) keeps the cache in memory only.
+        :param disk_maxsize: Number of files kept in cache_dir; the least recently used are removed beyond it.
+        """
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.disk_maxsize = disk_maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def fingerprint(*inputs: pd.Series) -> str:
+        """
+        Hash of the input values and their index, so the same prices always map to the same key.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        for series in inputs:
+            index = series.index
+            h.update(np.asarray(index.asi8 if isinstance(index, pd.DatetimeIndex) else index).tobytes())
+            h.update(np.ascontiguousarray(series.to_numpy(dtype=float)).tobytes())
+        return h.hexdigest()
+
+    def _disk_filepath(self, key: tuple) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key[2]}_{digest}.pkl")
+
+    def _evict_disk(self):
+        """
+        Removes the least recently used cache files (oldest modification time) beyond disk_maxsize.
+        """
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith('.pkl')]
+        except FileNotFoundError:
+            return
+        if len(entries) <= self.disk_maxsize:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.disk_maxsize]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass                # already evicted by another process
+
+    def _remember(self, key: tuple, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, name: str, compute, inputs: tuple, ticker: str = None, **params):
+        """
+        Returns the cached result of compute(*inputs, **params), computing and storing it on a miss.
+
+        :param name: Indicator name used in the key (e.g. 'bbands').
+        :param compute: Function computing the indicator from the inputs and params.
+        :param inputs: Input Series; their values and index make up the data fingerprint.
+        :param ticker: Optional ticker, only used to keep keys readable and distinct.
+        """
+        key = (ticker or '', self.fingerprint(*inputs), name, tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.cache_dir:
+            filepath = self._disk_filepath(key)
+            if os.path.exists(filepath):
+                try:
+                    value = pd.read_pickle(filepath)
+                    os.utime(filepath)      # keeps recently used files out of the eviction
+                    self._remember(key, value)
+                    with self._lock:
+                        self.hits += 1
+                    return value
+                except Exception as e:
+                    print(f"[!] Unreadable indicator cache file {filepath}: {e}")
+
+        value = compute(*inputs, **params)
+        with self._lock:
+            self.misses += 1
+        self._remember(key, value)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+            pd.to_pickle(value, tmp)
+            os.replace(tmp, filepath)
+            self._evict_disk()
+        return value
+
+    def clear(self, disk: bool = False):
+        """
+        Empties the in-memory LRU, and the on-disk cache too when disk is True.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+        if disk and self.cache_dir and os.path.isdir(self.cache_dir):
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith('.pkl'):
+                    os.remove(os.path.join(self.cache_dir, filename))
+
+    def bbands(self, close: pd.Series, length: int = 20, std: float = 2.0, ticker: str = None) -> pd.DataFrame:
+        return self.get('bbands', lambda c, length, std: ta.bbands(close=c, length=length, std=std), (close,), ticker, length=length, std=std)
+
+    def rsi(self, close: pd.Series, length: int = 14, ticker: str = None) -> pd.Series:
+        return self.get('rsi', lambda c, length: ta.rsi(c, length), (close,), ticker, length=length)
+
+    def atr(self, high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14, ticker: str = None) -> pd.Series:
+        return self.get('atr', lambda h, l, c, length: ta.atr(h, l, c, length), (high, low, close), ticker, length=length)
+
+    def sma(self, series: pd.Series, length: int = 20, ticker: str = None) -> pd.Series:
+        return self.get('sma', lambda s, length: ta.sma(s, length=length), (series,), ticker, length=length)
+
+
+# Shared by every strategy and backtest in the process. Setting INDICATOR_CACHE_DIR also persists it
+# on disk, shared across runs and pool workers.
+INDICATORS = indicator_cache(cache_dir=os.environ.get("INDICATOR_CACHE_DIR") or None)
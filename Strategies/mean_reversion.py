@@ -2,6 +2,7 @@ from backtesting import Strategy
 import pandas as pd
 import pandas_ta as ta
 import numpy as np
+from Strategies.indicators import INDICATORS
 
 class mean_reversion_strategy_custom():
     def __init__(self, lookback: int = 20, std_dev: float = 2.0, threshold: float = 0.0):
@@ -49,14 +50,15 @@ class mean_reversion_strategy(Strategy):
     atr_length = 14
     
     def init(self):        
-        price = pd.Series(self.data.Close)
-        high = pd.Series(self.data.High)
-        low = pd.Series(self.data.Low)
+        price = pd.Series(self.data.Close, index=self.data.index)
+        high = pd.Series(self.data.High, index=self.data.index)
+        low = pd.Series(self.data.Low, index=self.data.index)
 
-        bb = ta.bbands(close=price, length=self.bb_length, std=self.bb_std)
-        rsi = ta.rsi(price, self.rsi_length)
-        atr = ta.atr(high, low, price, self.atr_length)
-        volume_sma = ta.sma(pd.Series(self.data.Volume), length=20)
+        # Cached by data fingerprint, so sweeps over rsi_lower/rsi_upper and repeat runs reuse the bands
+        bb = INDICATORS.bbands(price, self.bb_length, self.bb_std)
+        rsi = INDICATORS.rsi(price, self.rsi_length)
+        atr = INDICATORS.atr(high, low, price, self.atr_length)
+        volume_sma = INDICATORS.sma(pd.Series(self.data.Volume, index=self.data.index), 20)
         
 
         self.lower = self.I(lambda x: bb[f'BBL_{self.bb_length}_{self.bb_std}'], 'BB_Lower')
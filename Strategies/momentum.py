@@ -1,31 +1,167 @@
 from data.data_loader import data_loader
+from portfolio.metrics import performance_metrics
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+
+def rolling_compound_returns(mtl: pd.DataFrame, window: int) -> pd.DataFrame:
+    """
+    Vectorized equivalent of mtl.rolling(window).apply(lambda x: np.prod(x) - 1).
+
+    Products are taken as differences of cumulative log sums, with zero and negative
+    factors tracked by separate running counts. A window holding any NaN is NaN,
+    exactly like rolling().apply with its default min_periods.
+
+    :param mtl: Gross returns (1 + r) per period, one column per ticker.
+    :param window: Number of periods compounded.
+    """
+    values = mtl.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    zero = valid & (values == 0)
+    negative = valid & (values < 0)
+    logs = np.log(np.abs(np.where(valid & ~zero, values, 1.0)))
+
+    def window_sum(x):
+        c = np.zeros((x.shape[0] + 1, x.shape[1]))
+        np.cumsum(x, axis=0, out=c[1:])
+        out = np.full(x.shape, np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    compounded = np.exp(window_sum(logs))
+    compounded = np.where(window_sum(negative) % 2 == 1, -compounded, compounded)
+    compounded = np.where(window_sum(zero) > 0, 0.0, compounded)
+    compounded = np.where(window_sum(valid) == window, compounded, np.nan)
+
+    return pd.DataFrame(compounded - 1, index=mtl.index, columns=mtl.columns)
+
+
+def cascade_top_k(signals: list, sizes: list) -> np.ndarray:
+    """
+    Cascaded top-K selection for every row at once.
+
+    Stage j keeps the sizes[j] largest values of signals[j] among the columns that
+    survived stage j-1 (NaNs are never selected). Ties at the cut-off are broken by
+    column order, like Series.nlargest(keep='first').
+
+    :param signals: 2D arrays (dates x tickers), one per stage.
+    :param sizes: Number of tickers kept at each stage.
+    :return: Boolean mask (dates x tickers) of the final selection.
+    """
+    mask = np.ones(np.shape(signals[0]), dtype=bool)
+    for signal, k in zip(signals, sizes):
+        s = np.where(mask & ~np.isnan(signal), signal, -np.inf)
+        k = min(k, s.shape[1])
+        if k <= 0:
+            return np.zeros_like(mask)
+
+        kth = -np.partition(-s, k - 1, axis=1)[:, k - 1:k]
+        greater = s > kth
+        equal = s == kth
+        need = k - greater.sum(axis=1, keepdims=True)
+        mask = (greater | (equal & (np.cumsum(equal, axis=1) <= need))) & (s > -np.inf)
+    return mask
+
+
+def select_momentum_weights(rolling_returns: list, sizes: list) -> pd.DataFrame:
+    """
+    Equal weights of the cascaded top-K momentum selection for every signal date.
+
+    :param rolling_returns: Rolling return frames (dates x tickers), longest lookback first.
+    :param sizes: Selection size per lookback, e.g. [30, 30, 10].
+    :return: DataFrame of weights indexed like the rolling return frames; rows sum to 1 (or 0 with no pick).
+    """
+    mask = cascade_top_k([r.to_numpy(dtype=float) for r in rolling_returns], sizes)
+    counts = mask.sum(axis=1, keepdims=True)
+    weights = np.divide(mask, counts, out=np.zeros(mask.shape), where=counts > 0)
+    return pd.DataFrame(weights, index=rolling_returns[0].index, columns=rolling_returns[0].columns)
+
+
+def daily_gross_returns(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily gross returns (1 + r) of a close panel; a return after a gap spans back to the last close.
+    """
+    return (panel.ffill().pct_change(fill_method=None) + 1)[1:]
+
+
+def drifting_portfolio_returns(gross: pd.DataFrame, weights: pd.DataFrame, commission: float = 0.0) -> pd.Series:
+    """
+    Daily returns of a portfolio bought at the monthly target weights on each month's first day and
+    left to drift until the next month: the daily weights are the targets scaled by each holding's
+    growth so far in the month, applied to the whole returns matrix in one product.
+
+    Compounded over a month this is exactly the weighted mean of the holdings' monthly gross returns.
+
+    :param gross: Daily gross returns (dates x tickers); NaN counts as a flat day.
+    :param weights: Target weights indexed by month end, same columns as gross.
+    :param commission: Fraction of equity charged on the first day of every month.
+    :return: Series of daily simple returns for the days of the weighted months.
+    """
+    month = gross.index + pd.offsets.MonthEnd(0)
+    held = month.isin(weights.index)
+    g = gross[held].fillna(1.0)
+    month = month[held]
+
+    w = weights.reindex(index=month, columns=g.columns).to_numpy(dtype=float)
+    growth = g.groupby(month).cumprod()
+    before = growth.groupby(month).shift(1).fillna(1.0)
+    value = (w * growth.to_numpy()).sum(axis=1)
+    prev_value = (w * before.to_numpy()).sum(axis=1)
+    returns = np.divide(value, prev_value, out=np.ones(len(g)), where=prev_value > 0) - 1
+
+    first_day = ~month.duplicated()
+    returns[first_day] = (1 + returns[first_day]) * (1 - commission) - 1
+    return pd.Series(returns, index=g.index)
 
 
 class momentum_strategy():
 
     LOOKBACK_WINDOWS = [12,6,3]
+    SELECTION_SIZES = [30,30,10]
 
-    def __init__(self, start_date, end_date, equity, commission: float=0.02, index:str="^GSPC", LOOKBACK_WINDOWS: list=[12,6,3]):
+    def __init__(self, start_date, end_date, equity, commission: float=0.02, index:str="^GSPC", LOOKBACK_WINDOWS: list=[12,6,3], SELECTION_SIZES: list=[30,30,10], market=None, index_returns: pd.Series=None):
+        """
+        :param market: Optional shared market_data (or data_loader) for the S&P 500 panel and the index.
+        :param index_returns: Optional preloaded daily index returns (see _get_index_returns), so sweeps and folds load them once.
+        """
+        self.market = market
+        self.index_returns = index_returns
         self.start_date = start_date
         self.end_date = end_date
         self.index = index
         self.LOOKBACK_WINDOWS = LOOKBACK_WINDOWS
+        self.SELECTION_SIZES = SELECTION_SIZES
         self.commission = commission/100
         self.equity = equity
 
-    def _get_data(self):
-        dl = data_loader()
-        df = dl.get_sp500_data_df(start=self.start_date, end=self.end_date)
-        mtl = (df.pct_change() + 1 )[1:].resample("ME").prod()
-        return mtl
-    
+    def _get_panel(self):
+        """
+        Daily close panel of the S&P 500 constituents over [start_date, end_date].
+        """
+        dl = self.market or data_loader()
+        return dl.get_sp500_data_df(start=self.start_date, end=self.end_date)
+
+    def _get_index_returns(self):
+        """
+        Daily returns of the benchmark index, aligned with the daily strategy returns.
+        Loaded once per strategy unless they were passed in.
+        """
+        if self.index_returns is not None:
+            return self.index_returns
+        data = (self.market or data_loader()).get_data(self.index, self.start_date, self.end_date)
+        if data is None or data.empty:
+            print(f"[!] No {self.index} data, alpha and beta are left empty.")
+            return None
+        self.index_returns = data['Close'].pct_change()
+        return self.index_returns
+
     def _get_rolling_returns(self, mtl, a, b, c):
-        f = lambda x: np.prod(x) - 1
-        return mtl.rolling(a).apply(f), mtl.rolling(b).apply(f), mtl.rolling(c).apply(f)
+        return rolling_compound_returns(mtl, a), rolling_compound_returns(mtl, b), rolling_compound_returns(mtl, c)
     
 
     def plot_preformance(self, save_path=None):
@@ -51,54 +187,15 @@ class momentum_strategy():
 
         return save_path
 
-    def _metrics(self, pf_series, risk_free_rate=0.0):
-        df = pf_series.copy()
-        df = df.dropna()
+    def _metrics(self, returns, risk_free_rate=0.0):
+        df = (1 + returns).cumprod()
         
         start = df.index[0]
         end = df.index[-1]
         duration = end - start
 
-        returns = df.pct_change().dropna()
-        cumulative_return = df[-1] / df[0] - 1
-        n_years = (df.index[-1] - df.index[0]).days / 365.25
-
-        cagr = (df[-1] / df[0])**(1/n_years) - 1
-        ann_vol = returns.std() * np.sqrt(12)
-        sharpe = (cagr - risk_free_rate) / ann_vol if ann_vol != 0 else np.nan
-
-        downside_returns = returns.copy()
-        downside_returns[downside_returns > 0] = 0
-        sortino = (cagr - risk_free_rate) / (downside_returns.std() * np.sqrt(12)) if downside_returns.std() != 0 else np.nan
-
-        running_max = df.cummax()
-        drawdown = (df - running_max) / running_max
-        max_dd = drawdown.min()
-        avg_dd = drawdown.mean()
-
-        # Calmar Ratio = CAGR / Max Drawdown (abs value)
-        calmar = cagr / abs(max_dd) if max_dd != 0 else np.nan
-
-        # Drawdown duration
-        dd_durations = []
-        in_drawdown = False
-        dd_start = None
-
-        for date, val in drawdown.items():
-            if val < 0:
-                if not in_drawdown:
-                    in_drawdown = True
-                    dd_start = date
-            elif in_drawdown:
-                in_drawdown = False
-                dd_end = date
-                dd_durations.append(dd_end - dd_start)
-
-        if in_drawdown:
-            dd_durations.append(df.index[-1] - dd_start)
-
-        max_dd_duration = max(dd_durations) if dd_durations else pd.Timedelta(0)
-        avg_dd_duration = sum(dd_durations, pd.Timedelta(0)) / len(dd_durations) if dd_durations else pd.Timedelta(0)
+        stats = performance_metrics(returns, periods_per_year=252, risk_free_rate=risk_free_rate, benchmark_returns=self._get_index_returns()).iloc[0]
+        cumulative_return = stats['Return [%]'] / 100
 
         metrics = {
             "Start": start,
@@ -109,44 +206,114 @@ class momentum_strategy():
             "Equity Peak [$]": df.max() * self.equity,
             "Return [%]": cumulative_return * 100,
             "Buy & Hold Return [%]": cumulative_return * 100,
-            "Return (Ann.) [%]": cagr * 100,
-            "Volatility (Ann.) [%]": ann_vol * 100,
-            "CAGR [%]": cagr * 100,
-            "Sharpe Ratio": sharpe,
-            "Sortino Ratio": sortino,
-            "Calmar Ratio": calmar,
-            "Alpha [%]": 0.0,  # Requires benchmark comparison
-            "Beta": 1.0,       # Requires benchmark comparison
-            "Max. Drawdown [%]": max_dd * 100,
-            "Avg. Drawdown [%]": avg_dd * 100,
-            "Max. Drawdown Duration": max_dd_duration,
-            "Avg. Drawdown Duration": avg_dd_duration
+            "Return (Ann.) [%]": stats['Return (Ann.) [%]'],
+            "Volatility (Ann.) [%]": stats['Volatility (Ann.) [%]'],
+            "CAGR [%]": stats['CAGR [%]'],
+            "Sharpe Ratio": stats['Sharpe Ratio'],
+            "Sortino Ratio": stats['Sortino Ratio'],
+            "Calmar Ratio": stats['Calmar Ratio'],
+            "Alpha [%]": stats['Alpha [%]'],
+            "Beta": stats['Beta'],
+            "Max. Drawdown [%]": stats['Max. Drawdown [%]'],
+            "Avg. Drawdown [%]": stats['Avg. Drawdown [%]'],
+            "Max. Drawdown Duration": stats['Max. Drawdown Duration'],
+            "Avg. Drawdown Duration": stats['Avg. Drawdown Duration']
         }
 
         return pd.Series(metrics)
 
         
-    def run(self):
+    def run(self, panel: pd.DataFrame = None):
+        """
+        Selects monthly on the cascaded momentum signals and holds each month's picks equally
+        weighted, drifting with their daily prices.
 
-        mtl = self._get_data()
+        :param panel: Optional preloaded daily close panel (see _get_panel), so sweeps and folds load it once.
+        :return: (metrics, Series of daily simple returns indexed by trading day).
+        """
+        if panel is None:
+            panel = self._get_panel()
+        gross = daily_gross_returns(panel)
+        mtl = gross.resample("ME").prod()
         ret_12, ret_6, ret_3 = self._get_rolling_returns(mtl, self.LOOKBACK_WINDOWS[0], self.LOOKBACK_WINDOWS[1], self.LOOKBACK_WINDOWS[2])
-        returns = []
-        if len(mtl) < 13:
+        warmup = max(self.LOOKBACK_WINDOWS)
+        if len(mtl) < warmup + 2:
             raise ValueError("Not enough data to compute momentum strategy.")
-            return
-        else:
-            for i in range(12, len(mtl)-1):
-                date = mtl.index[i]
-                next_date = mtl.index[i+1]
-
-                top_50 = ret_12.iloc[i-1].nlargest(30).index
-                top_30 = ret_6.iloc[i-1][top_50].nlargest(30).index
-                top_10 = ret_3.iloc[i-1][top_30].nlargest(10).index
-
-                monthly_ret = mtl.loc[next_date, top_10].mean()
-                returns.append(monthly_ret * (1-self.commission))
-
-        strat_pf = pd.Series(returns, index=mtl.index[13:]).cumprod()
-        self.strat_pf = strat_pf
-        metrics = self._metrics(strat_pf)
-        return metrics, pd.Series(returns)
+
+        # Selection made on month i-1 is held over month i+1
+        weights = select_momentum_weights([ret_12, ret_6, ret_3], self.SELECTION_SIZES).iloc[warmup - 1:len(mtl) - 2]
+        weights.index = mtl.index[warmup + 1:]
+        returns = drifting_portfolio_returns(gross, weights, self.commission)
+
+        self.weights = weights
+        self.returns = returns
+        self.strat_pf = (1 + returns).cumprod()
+        metrics = self._metrics(returns)
+        return metrics, returns
+
+
+# Daily close panel attached from shared memory once per sweep worker, with the index returns
+_SWEEP_PANEL = None
+_SWEEP_SHM = None
+_SWEEP_INDEX_RETURNS = None
+
+
+def _init_sweep_worker(shm_name, shape, index, columns, index_returns=None):
+    global _SWEEP_PANEL, _SWEEP_SHM, _SWEEP_INDEX_RETURNS
+    _SWEEP_INDEX_RETURNS = index_returns
+    _SWEEP_SHM = shared_memory.SharedMemory(name=shm_name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=_SWEEP_SHM.buf)
+    _SWEEP_PANEL = pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+def _run_sweep_config(config, panel=None, index_returns=None):
+    windows, sizes, commission, start_date, end_date, equity = config
+    index_returns = _SWEEP_INDEX_RETURNS if panel is None else index_returns
+    strategy = momentum_strategy(start_date, end_date, equity, commission, LOOKBACK_WINDOWS=list(windows),
+                                 SELECTION_SIZES=list(sizes), index_returns=index_returns)
+    try:
+        metrics, _ = strategy.run(_SWEEP_PANEL if panel is None else panel)
+    except Exception as e:
+        print(f"[!] Sweep config {windows} {sizes} {commission} failed: {e}")
+        metrics = pd.Series(dtype=float)
+    return {'windows': tuple(windows), 'selection_sizes': tuple(sizes), 'commission': commission, **metrics.to_dict()}
+
+
+def sweep_momentum(start_date, end_date, equity, windows_grid: list, sizes_grid: list, commissions: list, processes: int = None) -> pd.DataFrame:
+    """
+    Evaluates every (lookback windows, selection sizes, commission) combination of the grids.
+
+    The daily close panel is loaded once and placed in shared memory, so pool workers
+    attach to it instead of receiving a pickled copy with every task. The index returns
+    are loaded once too and handed to each worker when it starts.
+
+    :param windows_grid: List of lookback window triples, e.g. [[12, 6, 3], [9, 6, 3]].
+    :param sizes_grid: List of selection size triples, e.g. [[30, 30, 10], [50, 20, 5]].
+    :param commissions: Commissions in the same unit as momentum_strategy (percent).
+    :param processes: Pool size; defaults to os.cpu_count(). 1 runs in-process.
+    :return: One row per configuration with the _metrics outputs as columns.
+    """
+    base = momentum_strategy(start_date, end_date, equity)
+    panel = base._get_panel()
+    index_returns = base._get_index_returns()
+    configs = [
+        (tuple(w), tuple(k), c, start_date, end_date, equity)
+        for w, k, c in itertools.product(windows_grid, sizes_grid, commissions)
+    ]
+
+    if processes == 1:
+        return pd.DataFrame([_run_sweep_config(config, panel, index_returns) for config in configs])
+
+    values = np.ascontiguousarray(panel.to_numpy(dtype=np.float64))
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+        initargs = (shm.name, values.shape, panel.index, panel.columns, index_returns)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_sweep_worker, initargs=initargs) as pool:
+            chunksize = max(1, len(configs) // ((processes or os.cpu_count() or 1) * 4))
+            rows = list(pool.map(_run_sweep_config, configs, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame(rows)
@@ -1,6 +1,69 @@
 import pandas as pd
+import numpy as np
 from backtesting import Backtest
 import os
+import time
+import itertools
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+
+
+def _timed_run(spec: tuple, ticker: str, data: pd.DataFrame):
+    """
+    Runs one ticker and never raises, so pool workers can report failures per ticker.
+    Only the engine's spec (strategy_cls, strategy_kwargs, cash, commission) is sent with the task,
+    not the engine and the results it has accumulated.
+    Returns (ticker, stats, daily_returns, error, wall_time).
+    """
+    t0 = time.perf_counter()
+    try:
+        stats, daily_returns = GenericBacktestEngine(*spec).run(data)
+        return ticker, stats, daily_returns, None, time.perf_counter() - t0
+    except Exception as e:
+        return ticker, None, None, e, time.perf_counter() - t0
+
+
+_OPT_METRICS = ['Sharpe Ratio', 'Return [%]', 'CAGR [%]', 'Max. Drawdown [%]', 'Win Rate [%]', '# Trades']
+_OPT_ENGINE = None
+_OPT_DATA = None
+
+
+def _init_optimize_worker(engine, data_dict):
+    global _OPT_ENGINE, _OPT_DATA
+    _OPT_ENGINE, _OPT_DATA = engine, data_dict
+
+
+def _evaluate_config(params: dict, prune_after: int, prune_below: float, engine=None, data_dict=None) -> dict:
+    """
+    Backtests one parameter set over the ticker basket and averages its stats.
+    Stops early (pruned) once the mean Sharpe of the first prune_after tickers is below prune_below.
+    """
+    engine = engine or _OPT_ENGINE
+    data_dict = _OPT_DATA if data_dict is None else data_dict
+    run_kwargs = {**(engine.strategy_kwargs or {}), **params}
+
+    stats_rows = []
+    pruned = False
+    for i, (ticker, data) in enumerate(data_dict.items(), 1):
+        try:
+            stats = engine._backtest(data).run(**run_kwargs)
+        except Exception as e:
+            print(f"[!] {ticker} failed with {params}: {e}")
+            continue
+        stats_rows.append({metric: stats[metric] for metric in _OPT_METRICS})
+        if prune_after and prune_after <= i < len(data_dict):
+            sharpe = pd.Series([r['Sharpe Ratio'] for r in stats_rows], dtype=float).mean()
+            if not sharpe >= prune_below:
+                pruned = True
+                break
+
+    summary = pd.DataFrame(stats_rows, columns=_OPT_METRICS, dtype=float)
+    row = dict(params)
+    row.update(summary.drop(columns='# Trades').mean().to_dict())
+    row['# Trades'] = summary['# Trades'].sum()
+    row['Tickers'] = len(summary)
+    row['Pruned'] = pruned
+    return row
+
 
 class GenericBacktestEngine:
     def __init__(self, strategy_cls, strategy_kwargs: dict = None, cash: float = 10000, commission: float = 0.002):
@@ -17,27 +80,37 @@ class GenericBacktestEngine:
         self.strategy_kwargs = strategy_kwargs
         self.cash = cash
         self.commission = commission
+        self.results = {}   # ticker -> stats of its last backtest (incl. equity curve and trades)
+        self.timings = {}   # ticker -> wall time in seconds of its last backtest
+        self.errors = {}    # ticker -> exception raised by its last backtest
 
-    def run(self, data: pd.DataFrame):
-        """
-        Runs the backtest and returns results.
-        """
-        
-        bt = Backtest(
+    def _backtest(self, data: pd.DataFrame) -> Backtest:
+        return Backtest(
             data,
             self.strategy_cls,
             cash=self.cash,
             commission=self.commission
         )
-        stats = bt.run()
+
+    def run(self, data: pd.DataFrame, ticker: str = None):
+        """
+        Runs the backtest and returns results.
+        When a ticker is given the stats are kept in self.results so plot() can reuse them.
+        """
+        stats = self._backtest(data).run(**(self.strategy_kwargs or {}))
+        if ticker is not None:
+            self.results[ticker] = stats
         equity_curve = stats['_equity_curve']
         daily_returns = equity_curve['Equity'].pct_change().dropna()
         return stats, daily_returns
 
-    def plot(self, data: pd.DataFrame):
+    def plot(self, data: pd.DataFrame, ticker: str = None):
         """
         Plots the results using backtesting.py's built-in plot function.
         Saves the output as an HTML file and returns the relative path.
+        The stats already computed for the ticker are rendered when they cover the same
+        bars as data, so the plot matches the reported numbers and the backtest is not run
+        a second time; a different date range is backtested again.
         """
 
         strategy = self.strategy_cls.__name__
@@ -47,30 +120,99 @@ class GenericBacktestEngine:
         plot_filename = f"{strategy}_{start_date}--{end_date}.html"
         plot_path = os.path.join("reporting", "charts", plot_filename)
 
-        bt = Backtest(
-            data,
-            self.strategy_cls,
-            cash=self.cash,
-            commission=self.commission
-        )
-        bt.run(**(self.strategy_kwargs or {}))
+        stats = self.results.get(ticker) if ticker is not None else None
+        if stats is None or not stats['_equity_curve'].index.equals(data.index):
+            stats, _ = self.run(data, ticker)
 
-        bt.plot(filename=plot_path, open_browser=False)
+        self._backtest(data).plot(results=stats, filename=plot_path, open_browser=False)
 
         return plot_path
 
-    def batch_backtest(self, data_dict: dict):
+    def iter_backtest(self, data_dict: dict, processes: int = None, executor: Executor = None):
+        """
+        Runs backtests on a dict of ticker: DataFrame pairs and yields
+        (ticker, stats, daily_returns, error, wall_time) as each one finishes.
+
+        :param processes: Fan tickers out to a process pool of this size. None or 1 runs serially.
+        :param executor: Optional caller-owned executor to use instead of creating a pool.
+        """
+        spec = (self.strategy_cls, self.strategy_kwargs, self.cash, self.commission)
+        if executor is None and (processes is None or processes <= 1):
+            for ticker, data in data_dict.items():
+                yield _timed_run(spec, ticker, data)
+            return
+
+        pool = executor or ProcessPoolExecutor(max_workers=processes)
+        try:
+            futures = [pool.submit(_timed_run, spec, ticker, data) for ticker, data in data_dict.items()]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            if executor is None:
+                pool.shutdown(cancel_futures=True)
+
+    def batch_backtest(self, data_dict: dict, processes: int = None, executor: Executor = None):
         """
         Run backtests on a dict of ticker: DataFrame pairs.
-        Returns a dict of ticker: stats
+        Returns a dict of ticker: stats and a dict of ticker: daily returns, in input order.
+
+        :param processes: Fan tickers out to a process pool of this size. None or 1 runs serially.
+        :param executor: Optional caller-owned executor to use instead of creating a pool.
         """
         results = {}
         pf_returns = {}
-        for ticker, data in data_dict.items():
-            try:
-                stats, pf_ret = self.run(data)
-                pf_returns[ticker] = pf_ret
-                results[ticker] = stats
-            except Exception as e:
-                print(f"Failed on {ticker}: {e}")
-        return results, pf_returns
+        for ticker, stats, pf_ret, error, wall_time in self.iter_backtest(data_dict, processes, executor):
+            self.timings[ticker] = wall_time
+            if error is not None:
+                self.errors[ticker] = error
+                print(f"Failed on {ticker}: {error}")
+                continue
+            print(f"{ticker}: backtest finished in {wall_time:.2f}s")
+            self.results[ticker] = stats
+            results[ticker] = stats
+            pf_returns[ticker] = pf_ret
+
+        order = [ticker for ticker in data_dict if ticker in results]
+        return {t: results[t] for t in order}, {t: pf_returns[t] for t in order}
+
+    def optimize(self, data_dict: dict, param_grid: dict, n_iter: int = None, constraint=None, processes: int = None,
+                 prune_after: int = 5, prune_below: float = -0.5, random_state: int = None) -> pd.DataFrame:
+        """
+        Searches strategy parameters over a ticker basket and ranks them by mean Sharpe.
+
+        Each configuration is one pool task that backtests every ticker, so tasks are independent
+        and the search scales with the number of workers. The basket is sent to each worker once.
+
+        :param data_dict: Dict of ticker: OHLCV DataFrame.
+        :param param_grid: Dict of strategy parameter: list of values, e.g. {'rsi_lower': [20, 25, 30]}.
+        :param n_iter: Randomly sample this many configurations from the grid instead of the full sweep.
+        :param constraint: Optional function params -> bool filtering configurations (e.g. rsi_lower < rsi_upper).
+        :param processes: Pool size; defaults to os.cpu_count(). 1 runs in-process.
+        :param prune_after: Number of tickers after which a configuration is pruned if it looks bad. 0 disables pruning.
+        :param prune_below: Mean Sharpe below which a configuration is pruned.
+        :param random_state: Seed for the random search.
+        :return: One row per configuration with its params, mean stats, total trades, tickers run and a Pruned flag,
+                 best mean Sharpe first.
+        """
+        keys = list(param_grid)
+        configs = [dict(zip(keys, values)) for values in itertools.product(*param_grid.values())]
+        if constraint is not None:
+            configs = [config for config in configs if constraint(config)]
+        if n_iter is not None and n_iter < len(configs):
+            picks = np.random.default_rng(random_state).choice(len(configs), n_iter, replace=False)
+            configs = [configs[i] for i in sorted(picks)]
+
+        t0 = time.perf_counter()
+        engine = GenericBacktestEngine(self.strategy_cls, self.strategy_kwargs, self.cash, self.commission)
+        if processes == 1:
+            rows = [_evaluate_config(config, prune_after, prune_below, engine, data_dict) for config in configs]
+        else:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_optimize_worker, initargs=(engine, data_dict)) as pool:
+                futures = [pool.submit(_evaluate_config, config, prune_after, prune_below) for config in configs]
+                rows = [future.result() for future in futures]
+
+        table = pd.DataFrame(rows, columns=keys + _OPT_METRICS + ['Tickers', 'Pruned'])
+        # Pruned configurations only saw part of the basket, so they rank after complete ones
+        table = table.sort_values(['Pruned', 'Sharpe Ratio'], ascending=[True, False], na_position='last', kind='stable').reset_index(drop=True)
+        print(f"✅ Evaluated {len(table)} configurations ({int(table['Pruned'].sum())} pruned) in {time.perf_counter() - t0:.1f}s")
+        return table
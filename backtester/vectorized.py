@@ -0,0 +1,251 @@
+import numpy as np
+import pandas as pd
+from portfolio.metrics import performance_metrics
+from Strategies.indicators import INDICATORS
+from Strategies.mean_reversion import mean_reversion_strategy
+
+FLAT, LONG, SHORT = 0, 1, 2
+_DIRECTION = np.array([0, 1, -1])
+
+
+def mean_reversion_signals(data: pd.DataFrame, bb_length=20, bb_std=2.0, rsi_length=15, atr_length=14, volume_length=20) -> pd.DataFrame:
+    """
+    Computes the indicators used by mean_reversion_strategy as whole columns.
+
+    :param data: OHLCV DataFrame.
+    :return: DataFrame with 'lower', 'middle', 'upper', 'rsi', 'atr' and 'volume_sma' columns.
+    """
+    price = data['Close']
+    bb = INDICATORS.bbands(price, bb_length, bb_std)
+    return pd.DataFrame({
+        'lower': bb[f'BBL_{bb_length}_{bb_std}'],
+        'middle': bb[f'BBM_{bb_length}_{bb_std}'],
+        'upper': bb[f'BBU_{bb_length}_{bb_std}'],
+        'rsi': INDICATORS.rsi(price, rsi_length),
+        'atr': INDICATORS.atr(data['High'], data['Low'], price, atr_length),
+        'volume_sma': INDICATORS.sma(data['Volume'], volume_length),
+    }, index=data.index)
+
+
+def _transitions(close, lower, upper, rsi, volume, volume_sma, rsi_lower, rsi_upper) -> np.ndarray:
+    """
+    Encodes mean_reversion_strategy.next() as one state map per bar:
+    row t holds the state after bar t's close for each state (FLAT, LONG, SHORT) before it.
+    """
+    with np.errstate(invalid='ignore'):
+        active = ~(volume < volume_sma)      # next() returns early on low volume
+        below = close < lower
+        above = close > upper
+        enter_long = below & (rsi < rsi_lower)
+        enter_short = above & (rsi > rsi_upper)
+
+    f = np.empty((len(close), 3), dtype=np.int8)
+    f[:, FLAT] = np.where(active & enter_long, LONG, np.where(active & enter_short, SHORT, FLAT))
+    f[:, LONG] = np.where(active & above, FLAT, LONG)
+    f[:, SHORT] = np.where(active & below, FLAT, SHORT)
+    return f
+
+
+def _scan_states(f: np.ndarray, initial: int = FLAT) -> np.ndarray:
+    """
+    Runs the state machine over every bar with a parallel prefix scan: the per-bar
+    maps are composed pairwise in log2(n) vectorized passes instead of a bar loop.
+    """
+    prefix = f.copy()
+    offset = 1
+    while offset < len(prefix):
+        prefix[offset:] = np.take_along_axis(prefix[offset:], prefix[:-offset], axis=1)
+        offset *= 2
+    return prefix[:, initial]
+
+
+def simulate_positions(data: pd.DataFrame, signals: pd.DataFrame, rsi_lower=30, rsi_upper=70, stop_atr=1.5, target_atr=3.0):
+    """
+    Position state machine of mean_reversion_strategy.
+
+    Decisions are taken at the close and filled at the next open. Longs exit when
+    the close crosses the upper band; shorts exit below the lower band or on their
+    stop-loss / take-profit (set from the signal bar's ATR and checked intrabar).
+    Only stopped-out shorts need a re-scan of the remaining bars. Bars before the
+    indicator warm-up are skipped like Backtest.run does.
+
+    :return: (decisions, stopped, stop_price) arrays; decisions hold FLAT/LONG/SHORT after each close.
+    """
+    o, h, l, c = (data[col].to_numpy(dtype=float) for col in ('Open', 'High', 'Low', 'Close'))
+    atr = signals['atr'].to_numpy(dtype=float)
+    f = _transitions(
+        c, signals['lower'].to_numpy(dtype=float), signals['upper'].to_numpy(dtype=float),
+        signals['rsi'].to_numpy(dtype=float), data['Volume'].to_numpy(dtype=float),
+        signals['volume_sma'].to_numpy(dtype=float), rsi_lower, rsi_upper
+    )
+    # backtesting.py only calls next() once every indicator has warmed up (plus one bar)
+    warmup = 1 + int(np.isnan(signals.to_numpy(dtype=float)).argmin(axis=0).max())
+    f[:warmup] = [FLAT, LONG, SHORT]
+    n = len(c)
+    decisions = _scan_states(f)
+    stopped = np.zeros(n, dtype=bool)
+    stop_price = np.full(n, np.nan)
+
+    start = 0
+    while True:
+        previous = np.r_[FLAT, decisions[:-1]]
+        begins = np.flatnonzero((decisions == SHORT) & ((previous != SHORT) | stopped))
+        restarted = False
+        for b in begins[(begins >= start) & (begins < n - 1)]:
+            sl, tp = c[b] + stop_atr * atr[b], c[b] - target_atr * atr[b]
+            if np.isnan(sl):
+                continue
+            later = np.flatnonzero((decisions[b + 1:] != SHORT) | stopped[b + 1:])
+            last_held = b + 1 + later[0] if len(later) else n - 1
+            held = slice(b + 1, last_held + 1)
+            hit = (h[held] >= sl) | (l[held] <= tp)
+            if not hit.any():
+                continue
+
+            k = b + 1 + int(np.argmax(hit))
+            stopped[k] = True
+            stop_price[k] = max(o[k], sl) if h[k] >= sl else min(o[k], tp)
+            decisions[k:] = _scan_states(f[k:], FLAT)
+            start = k
+            restarted = True
+            break
+        if not restarted:
+            return decisions, stopped, stop_price
+
+
+def _simulate_trades(data: pd.DataFrame, cash: float, commission: float, size: float, params: dict):
+    """
+    Equity curve and closed trades of mean_reversion_strategy on one ticker.
+
+    :return: (equity Series, exposure mask, trades DataFrame in backtesting.py's layout).
+    """
+    p = {k: getattr(mean_reversion_strategy, k) for k in ('bb_length', 'bb_std', 'rsi_length', 'rsi_lower', 'rsi_upper', 'atr_length')}
+    p.update(params)
+    signals = mean_reversion_signals(data, p['bb_length'], p['bb_std'], p['rsi_length'], p['atr_length'])
+    decisions, stopped, stop_price = simulate_positions(data, signals, p['rsi_lower'], p['rsi_upper'])
+
+    o, c = data['Open'].to_numpy(dtype=float), data['Close'].to_numpy(dtype=float)
+    held_open = np.r_[FLAT, decisions[:-1]]                 # position carried from each open
+    held_close = np.where(stopped, FLAT, held_open)          # position still open at each close
+    prev_close = np.r_[FLAT, held_close[:-1]]
+
+    entry = (held_open != FLAT) & (prev_close == FLAT)
+    exit_at_open = (prev_close != FLAT) & (held_open == FLAT)
+    exit_bar = exit_at_open | stopped
+    exit_price = np.where(stopped, stop_price, o)
+
+    entry_price = pd.Series(np.where(entry, o, np.nan)).ffill().to_numpy()
+    direction = _DIRECTION[pd.Series(np.where(entry, held_open, np.nan)).ffill().fillna(FLAT).to_numpy(dtype=int)]
+
+    # Equity as a multiple of cash: closed trades compound, the open trade is marked to market
+    with np.errstate(invalid='ignore'):
+        exit_factor = np.where(
+            exit_bar,
+            1 + size * direction * (exit_price / entry_price - 1) - size * commission * (1 + exit_price / entry_price),
+            1.0
+        )
+        open_factor = np.where(held_close != FLAT, 1 + size * direction * (c / entry_price - 1) - size * commission, 1.0)
+    closed = np.cumprod(exit_factor)
+    equity = cash * closed * open_factor
+
+    # Closed trades in backtesting.py's trades layout
+    entry_bars = np.flatnonzero(entry)
+    exit_bars = np.flatnonzero(exit_bar)[:len(entry_bars)]
+    entry_bars = entry_bars[:len(exit_bars)]
+    equity_before = cash * np.r_[1.0, closed][entry_bars] if len(entry_bars) else np.array([])
+    units = size * equity_before / o[entry_bars] * direction[entry_bars]
+    pnl = units * (exit_price[exit_bars] - o[entry_bars]) - size * commission * equity_before * (1 + exit_price[exit_bars] / o[entry_bars])
+    index = data.index
+    trades = pd.DataFrame({
+        'Size': units,
+        'EntryBar': entry_bars,
+        'ExitBar': exit_bars,
+        'EntryPrice': o[entry_bars],
+        'ExitPrice': exit_price[exit_bars],
+        'SL': np.nan,
+        'TP': np.nan,
+        'PnL': pnl,
+        'ReturnPct': direction[entry_bars] * (exit_price[exit_bars] / o[entry_bars] - 1),
+        'EntryTime': index[entry_bars],
+        'ExitTime': index[exit_bars],
+    })
+    trades['Duration'] = trades['ExitTime'] - trades['EntryTime']
+    return pd.Series(equity, index=index), (held_open != FLAT) | (held_close != FLAT), trades
+
+
+def _trade_stats(trades: pd.DataFrame) -> dict:
+    """
+    backtesting.py's per-trade stats of a closed trades table.
+    """
+    pnl, returns = trades['PnL'], trades['ReturnPct']
+    losses = -pnl[pnl < 0].sum()
+    return {
+        '# Trades': len(trades),
+        'Win Rate [%]': (pnl > 0).mean() * 100 if len(trades) else np.nan,
+        'Best Trade [%]': returns.max() * 100,
+        'Worst Trade [%]': returns.min() * 100,
+        'Avg. Trade [%]': (np.exp(np.log1p(returns).mean()) - 1) * 100 if len(trades) else np.nan,
+        'Max. Trade Duration': trades['Duration'].max(),
+        'Avg. Trade Duration': trades['Duration'].mean(),
+        'Profit Factor': pnl[pnl > 0].sum() / losses if losses > 0 else np.nan,
+        'Expectancy [%]': returns.mean() * 100,
+    }
+
+
+def vectorized_batch_backtest(data_dict: dict, cash: float = 10000, commission: float = 0.002, size: float = 0.5, **params):
+    """
+    Screens a dict of ticker: DataFrame pairs with the array-based equivalent of running
+    mean_reversion_strategy through backtesting.py.
+
+    Trades use `size` of equity at entry, like Strategy.buy(size=0.5), with fractional units.
+    The equity curves of all tickers are stacked into one matrix and scored with a single
+    performance_metrics pass: the stats keep backtesting.py's key names, with the formulas the
+    portfolio reports use.
+
+    :param params: Overrides for the strategy's class-level parameters (bb_length, rsi_lower, ...).
+    :return: A dict of ticker: stats and a dict of ticker: daily returns, like GenericBacktestEngine.batch_backtest.
+    """
+    runs = {}
+    for ticker, data in data_dict.items():
+        try:
+            runs[ticker] = _simulate_trades(data, cash, commission, size, params)
+        except Exception as e:
+            print(f"Failed on {ticker}: {e}")
+    return _report(runs)
+
+
+def _report(runs: dict):
+    """
+    Stats of every simulated ticker, with the return and drawdown metrics from one performance_metrics call.
+    """
+    if not runs:
+        return {}, {}
+    equity = pd.DataFrame({ticker: run[0] for ticker, run in runs.items()})
+    pf_returns = {ticker: run[0].pct_change().dropna() for ticker, run in runs.items()}
+    metrics = performance_metrics(pd.DataFrame(pf_returns).reindex(equity.index)).drop(columns=['R²', 'Tracking Error (Ann.) [%]', 'Information Ratio'])
+
+    results = {}
+    for ticker, (curve, exposed, trades) in runs.items():
+        results[ticker] = pd.Series({
+            'Start': curve.index[0],
+            'End': curve.index[-1],
+            'Duration': curve.index[-1] - curve.index[0],
+            'Exposure Time [%]': exposed.mean() * 100,
+            'Equity Final [$]': curve.iloc[-1],
+            'Equity Peak [$]': curve.max(),
+            **metrics.loc[ticker].to_dict(),
+            **_trade_stats(trades),
+            '_equity_curve': pd.DataFrame({'Equity': curve}),
+            '_trades': trades,
+        })
+    return results, pf_returns
+
+
+def vectorized_mean_reversion_backtest(data: pd.DataFrame, cash: float = 10000, commission: float = 0.002, size: float = 0.5, **params):
+    """
+    vectorized_batch_backtest on a single ticker.
+
+    :return: (stats, daily_returns) like GenericBacktestEngine.run.
+    """
+    results, pf_returns = _report({0: _simulate_trades(data, cash, commission, size, params)})
+    return results[0], pf_returns[0]
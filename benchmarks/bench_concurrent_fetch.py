@@ -0,0 +1,93 @@
+"""
+Serial vs concurrent get_multiple_data against a local fake price source.
+
+The fake downloader sleeps to emulate network latency, fails the first attempt
+for a share of tickers to exercise retry/backoff and never returns data for a
+few tickers so per-ticker failure reporting can be checked. Run from the repo root:
+
+    python benchmarks/bench_concurrent_fetch.py
+"""
+import functools
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.data_loader import data_loader
+
+START = '2020-01-01'
+END = '2025-01-01'
+N_TICKERS = 200
+LATENCY = 0.05
+
+
+@functools.lru_cache(maxsize=None)
+def _business_days(start, end):
+    days = np.arange(start, end, dtype='datetime64[D]')
+    return pd.DatetimeIndex(days[np.is_busday(days)], name='Date')
+
+
+class fake_source:
+
+    def __init__(self, latency: float, flaky_every: int = 7, missing_every: int = 50):
+        self.latency = latency
+        self.flaky_every = flaky_every
+        self.missing_every = missing_every
+        self.calls = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker, start, end):
+        time.sleep(self.latency)
+        idx = int(ticker[1:])
+        with self._lock:
+            self.calls += 1
+            first_attempt = ticker not in self._seen
+            self._seen.add(ticker)
+        if idx % self.flaky_every == 0 and first_attempt:
+            raise ConnectionError(f"transient error for {ticker}")
+        if idx % self.missing_every == 0:
+            return None
+
+        dates = _business_days(start, end)
+        rng = np.random.default_rng(idx)
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+        return pd.DataFrame({
+            'Close': close, 'High': close * 1.01, 'Low': close * 0.99, 'Open': close, 'Volume': 1e6,
+        }, index=dates)
+
+
+def _run(max_workers):
+    source = fake_source(LATENCY)
+    loader = data_loader(downloader=source, max_workers=max_workers, backoff=0.01)
+    tmp = tempfile.mkdtemp()
+    loader.raw_path = loader.store_path = tmp
+    tickers = [f"T{i}" for i in range(1, N_TICKERS + 1)]
+
+    t0 = time.perf_counter()
+    data = loader.get_multiple_data(tickers, START, END)
+    elapsed = time.perf_counter() - t0
+    return data, loader.failures, source.calls, elapsed
+
+
+def main():
+    serial, serial_failures, serial_calls, serial_time = _run(max_workers=1)
+    for workers in (8, 32):
+        data, failures, calls, elapsed = _run(max_workers=workers)
+        assert data.keys() == serial.keys() and failures == serial_failures and calls == serial_calls
+        for ticker, df in data.items():
+            pd.testing.assert_frame_equal(df, serial[ticker], check_freq=False)
+        print(f"{workers:>2} workers: {elapsed:.2f}s  ({serial_time / elapsed:.1f}x vs serial)")
+
+    print(f"serial:     {serial_time:.2f}s for {N_TICKERS} tickers, {serial_calls} downloader calls")
+    print(f"failures:   {serial_failures}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Cold/warm load benchmark for the S&P 500 close panel.
+
+Compares the legacy path (one pd.read_csv per ticker followed by pd.concat)
+against the columnar store in data/store. Run from the repo root:
+
+    python benchmarks/bench_data_loader.py
+"""
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.data_loader import data_loader
+
+START = '2020-01-01'
+END = '2025-01-01'
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def _legacy_close_panel(loader, tickers):
+    close_prices = []
+    for ticker in tickers:
+        df = pd.read_csv(loader._raw_filepath(ticker), index_col='Date', parse_dates=True).loc[START:END]
+        close_prices.append(df[['Close']].rename(columns={'Close': ticker}))
+    return pd.concat(close_prices, axis=1)
+
+
+def main():
+    loader = data_loader()
+    tickers = sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(loader.raw_path, "*.csv")))
+
+    if not os.path.exists(loader._store_filepath()):
+        count, elapsed = _timed(loader.migrate_raw_to_store)
+        print(f"migration: {count} tickers in {elapsed:.2f}s")
+
+    legacy, legacy_time = _timed(lambda: _legacy_close_panel(loader, tickers))
+
+    cold_loader = data_loader()
+    cold, cold_time = _timed(lambda: cold_loader.get_close_panel(tickers, START, END))
+    warm, warm_time = _timed(lambda: cold_loader.get_close_panel(tickers, START, END))
+
+    pd.testing.assert_frame_equal(legacy.sort_index(axis=1), cold.sort_index(axis=1), check_freq=False)
+
+    print(f"tickers: {len(tickers)}  panel shape: {cold.shape}")
+    print(f"legacy CSV load: {legacy_time:.3f}s")
+    print(f"store cold load: {cold_time:.3f}s  ({legacy_time / cold_time:.1f}x)")
+    print(f"store warm load: {warm_time:.3f}s  ({legacy_time / warm_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Scoring many return series: one performance_metrics call per series vs a single
+call on the whole returns matrix. Run from the repo root:
+
+    python benchmarks/bench_metrics.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from portfolio.metrics import performance_metrics
+
+N_DAYS = 1260
+N_SERIES = 2000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range('2020-01-01', periods=N_DAYS)
+    returns = pd.DataFrame(rng.normal(0.0004, 0.012, (N_DAYS, N_SERIES)), index=index)
+    market = pd.Series(rng.normal(0.0003, 0.01, N_DAYS), index=index)
+
+    t0 = time.perf_counter()
+    looped = pd.concat([performance_metrics(returns[[c]], benchmark_returns=market) for c in returns.columns])
+    loop_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = performance_metrics(returns, benchmark_returns=market)
+    batch_time = time.perf_counter() - t0
+
+    numeric = batched.columns.drop(['Max. Drawdown Duration', 'Avg. Drawdown Duration'])
+    same = np.allclose(looped[numeric].to_numpy(dtype=float), batched[numeric].to_numpy(dtype=float), equal_nan=True)
+    same &= looped['Max. Drawdown Duration'].equals(batched['Max. Drawdown Duration'])
+    print(f"{N_SERIES} series x {N_DAYS} days")
+    print(f"per series : {loop_time:.2f}s")
+    print(f"one matrix : {batch_time:.2f}s  ({loop_time / batch_time:.1f}x)")
+    print(f"identical  : {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Rolling compounded returns: rolling().apply(np.prod) vs the vectorized
+rolling_compound_returns used by momentum_strategy, on a 300 x 500 monthly panel.
+Timing only; check_momentum_returns.py checks the two agree. Run from the repo root:
+
+    python benchmarks/bench_momentum_returns.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Strategies.momentum import rolling_compound_returns
+
+N_MONTHS = 300
+N_TICKERS = 500
+WINDOWS = [12, 6, 3]
+
+
+def _panel():
+    rng = np.random.default_rng(0)
+    values = 1 + rng.normal(0.01, 0.08, (N_MONTHS, N_TICKERS))
+    values[rng.random(values.shape) < 0.01] = np.nan              # scattered gaps
+    values[:rng.integers(0, 60), :50] = np.nan                      # late listings
+    values[rng.integers(0, N_MONTHS, 5), rng.integers(0, N_TICKERS, 5)] = 0.0   # wiped out
+    index = pd.date_range('2000-01-31', periods=N_MONTHS, freq='ME')
+    return pd.DataFrame(values, index=index, columns=[f"T{i}" for i in range(N_TICKERS)])
+
+
+def main():
+    mtl = _panel()
+    f = lambda x: np.prod(x) - 1
+
+    t0 = time.perf_counter()
+    for w in WINDOWS:
+        mtl.rolling(w).apply(f)
+    apply_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for w in WINDOWS:
+        rolling_compound_returns(mtl, w)
+    vector_time = time.perf_counter() - t0
+
+    print(f"panel: {N_MONTHS} x {N_TICKERS}, windows {WINDOWS}")
+    print(f"rolling().apply: {apply_time:.3f}s")
+    print(f"vectorized:      {vector_time:.4f}s  ({apply_time / vector_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Mean-reversion screen over the cached store: backtesting.py's bar-by-bar engine
+vs the vectorized backtester, with a per-ticker comparison of trades and returns.
+Run from the repo root after `python -m data.data_loader`:
+
+    python benchmarks/bench_vectorized_mean_reversion.py
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backtester.engine import GenericBacktestEngine
+from backtester.vectorized import vectorized_batch_backtest
+from data.data_loader import data_loader
+from Strategies.mean_reversion import mean_reversion_strategy
+
+START, END = '2020-01-01', '2025-01-01'
+N_TICKERS = 50
+
+
+def main():
+    warnings.simplefilter('ignore')
+    loader = data_loader()
+    tickers = sorted(loader._load_coverage())[:N_TICKERS]
+    data = {t: df for t, df in loader.get_multiple_data(tickers, START, END).items() if df is not None and len(df) > 50}
+
+    engine = GenericBacktestEngine(mean_reversion_strategy, cash=10000, commission=0.002)
+    t0 = time.perf_counter()
+    for ticker, df in data.items():
+        engine.run(df, ticker)
+    loop_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vec_results, _ = vectorized_batch_backtest(data, cash=10000, commission=0.002)
+    vec_time = time.perf_counter() - t0
+
+    trades_equal = np.mean([engine.results[t]['# Trades'] == vec_results[t]['# Trades'] for t in data])
+    return_gap = np.median([abs(engine.results[t]['Return [%]'] - vec_results[t]['Return [%]']) for t in data])
+    print(f"{len(data)} tickers")
+    print(f"backtesting.py : {loop_time:.2f}s")
+    print(f"vectorized     : {vec_time:.2f}s  ({loop_time / vec_time:.1f}x)")
+    print(f"same trade count on {trades_equal:.0%} of tickers, median |Return [%] gap| {return_gap:.3f} (whole vs fractional units)")
+
+
+if __name__ == "__main__":
+    main()
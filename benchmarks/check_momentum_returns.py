@@ -0,0 +1,44 @@
+"""
+Equality check of the vectorized rolling_compound_returns against the
+rolling().apply(np.prod) reference on a small monthly panel with gaps,
+late listings, zeros and negative factors. Runs in well under a second;
+timing lives in bench_momentum_returns.py. Run from the repo root:
+
+    python benchmarks/check_momentum_returns.py
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Strategies.momentum import rolling_compound_returns
+
+WINDOWS = [12, 6, 3, 1]
+
+
+def _panel() -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    values = 1 + rng.normal(0.01, 0.08, (36, 4))
+    values[5, 0] = np.nan           # a gap
+    values[:14, 1] = np.nan         # a late listing
+    values[20, 2] = 0.0             # wiped out
+    values[[8, 9, 30], 3] = -0.5    # negative factors flip the sign of a window
+    index = pd.date_range('2020-01-31', periods=len(values), freq='ME')
+    return pd.DataFrame(values, index=index, columns=['A', 'B', 'C', 'D'])
+
+
+def main():
+    mtl = _panel()
+    for window in WINDOWS:
+        expected = mtl.rolling(window).apply(lambda x: np.prod(x) - 1, raw=True)
+        actual = rolling_compound_returns(mtl, window)
+        assert (expected.isna() == actual.isna()).all().all(), f"NaN pattern differs for window {window}"
+        pd.testing.assert_frame_equal(expected, actual, check_exact=False, rtol=1e-10, atol=1e-12)
+    print(f"✅ rolling_compound_returns matches rolling().apply for windows {WINDOWS}")
+
+
+if __name__ == "__main__":
+    main()
@@ -75,6 +75,9 @@ if run_simulation:
             st.subheader("Factor Investing")
             st.dataframe(factor_results)
 
+            st.subheader("Against the Benchmark (^GSPC)")
+            st.dataframe(port.benchmark_regression)
+
             st.subheader("Overall Daily Strategy Preformance")
             st.dataframe(returns_df)
 
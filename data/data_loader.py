@@ -1,69 +1,483 @@
 import yfinance as yf
 import os
+import glob
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
-from typing import List, Union
+from pandas.tseries.holiday import USFederalHolidayCalendar
+from pandas.tseries.offsets import CustomBusinessDay
+from typing import Callable, List, Union
 import json
+import gzip
+
+
+# Approximates the exchange calendar; only used to skip head/tail gaps that cannot hold a bar
+_TRADING_DAY = CustomBusinessDay(calendar=USFederalHolidayCalendar())
+
+
+class token_bucket:
+    """
+    Thread-safe token bucket: allows bursts of `capacity` calls and `rate` calls per second sustained.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
 
 
 class data_loader:
 
-    def __init__(self):
+    SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+    PRICE_COLUMNS = ['Close', 'High', 'Low', 'Open', 'Volume']
+
+    # yfinance .info keys kept in the fundamentals snapshot table
+    FUNDAMENTAL_FIELDS = [
+        'priceToBook', 'trailingPE', 'forwardPE', 'enterpriseToEbitda',
+        'debtToEquity', 'returnOnEquity', 'returnOnAssets', 'grossMargins',
+        'operatingMargins', 'freeCashflow', 'revenueGrowth', 'earningsGrowth',
+        'beta', 'marketCap'
+    ]
+
+    def __init__(self, downloader: Callable = None, max_workers: int = 8, max_retries: int = 2, backoff: float = 1.0):
+        """
+        :param downloader: Callable (ticker, start, end) -> OHLCV DataFrame or None. Defaults to yfinance.
+        :param max_workers: Thread pool size used by get_multiple_data (1 = serial).
+        :param max_retries: Retries for a failed download before the ticker is reported.
+        :param backoff: Base delay in seconds, doubled after every failed attempt.
+        """
         self.raw_path = "./data/raw"
         self.processed_path = "./data/processed"
+        self.store_path = "./data/store"
+        self.downloader = downloader or self._yf_download
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failures = {}          # ticker -> reason of the last failed load
+        self.fundamentals_limiter = token_bucket(rate=5, capacity=5)   # only throttles yfinance .info calls
+        self._lock = threading.RLock()
+        self._store = None          # (Ticker, Date) indexed price frame, read once per loader
+        self._pending = {}          # ticker -> full price frame not yet written to the store
+        self._close_panel = None    # Date x Ticker close prices built from the store
+        self._coverage = None       # ticker -> [start, end) date range already fetched
+        self._fundamentals = None   # (Date, Ticker) fundamentals snapshots, read once per loader
+        self._fundamentals_failed = set()   # tickers a snapshot build got no fundamentals for
+        self._constituents = None   # S&P 500 members and their add/remove history, read once per loader
+        self._defer_flush = 0
 
     def _raw_filepath(self, ticker: str) -> str:
         return os.path.join(self.raw_path, f"{ticker}.csv")
 
-    def get_data(self, ticker: str, start: str, end: str) -> pd.DataFrame:
-        ticker = ticker.replace('.', '-')
+    def _store_filepath(self) -> str:
+        return os.path.join(self.store_path, "prices.parquet")
+
+    def _coverage_filepath(self) -> str:
+        return os.path.join(self.store_path, "coverage.json")
+
+    def _fundamentals_filepath(self) -> str:
+        return os.path.join(self.store_path, "fundamentals.parquet")
 
+    def _constituents_filepath(self) -> str:
+        return os.path.join(self.store_path, "sp500_constituents.parquet")
+
+    def _empty_store(self) -> pd.DataFrame:
+        index = pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])], names=['Ticker', 'Date'])
+        return pd.DataFrame(columns=self.PRICE_COLUMNS, index=index, dtype=float)
+
+    def _load_store(self) -> pd.DataFrame:
+        """
+        Loads the columnar price store with a single bulk read. Subsequent calls
+        on the same loader are served from memory.
+        """
+        with self._lock:
+            if self._store is None:
+                filepath = self._store_filepath()
+                if os.path.exists(filepath):
+                    store = pd.read_parquet(filepath)
+                    self._store = store.set_index(['Ticker', 'Date']).sort_index()
+                else:
+                    self._store = self._empty_store()
+            return self._store
+
+    def _load_coverage(self) -> dict:
+        with self._lock:
+            if self._coverage is None:
+                self._coverage = {}
+                filepath = self._coverage_filepath()
+                if os.path.exists(filepath):
+                    with open(filepath, 'r') as f:
+                        self._coverage = {t: (pd.Timestamp(s), pd.Timestamp(e)) for t, (s, e) in json.load(f).items()}
+            return self._coverage
+
+    def _get_coverage(self, ticker: str, cached: pd.DataFrame):
+        """
+        Returns the [start, end) range fetched for a ticker. Data cached before
+        coverage was tracked is assumed to span its first to last bar.
+        """
+        with self._lock:
+            coverage = self._load_coverage()
+            if ticker not in coverage and cached is not None and not cached.empty:
+                coverage[ticker] = (cached.index[0], cached.index[-1] + pd.Timedelta(days=1))
+            return coverage.get(ticker)
+
+    def _missing_segments(self, ticker: str, start, end, cached: pd.DataFrame) -> list:
+        """
+        Returns the head/tail [start, end) segments of a request not covered by the cache.
+        Segments always reach the cached range, so a request entirely before or after it also
+        fetches the gap in between and coverage stays one contiguous interval.
+        Segments that contain no trading day are dropped so holidays never hit the network.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        coverage = self._get_coverage(ticker, cached)
+        if coverage is None:
+            segments = [(start, end)]
+        else:
+            cov_start, cov_end = coverage
+            segments = []
+            if start < cov_start:
+                segments.append((start, cov_start))
+            if end > cov_end:
+                segments.append((cov_end, end))
+
+        today = pd.Timestamp.today().normalize()
+        return [
+            (seg_start, seg_end) for seg_start, seg_end in segments
+            if seg_start < today and _TRADING_DAY.rollforward(seg_start) < seg_end
+        ]
+
+    def _flush_store(self):
+        """
+        Merges pending ticker frames into the store and rewrites the parquet file.
+        """
+        with self._lock:
+            if not self._pending or self._defer_flush:
+                return
+            store = self._load_store()
+            new = pd.concat(self._pending, names=['Ticker', 'Date'])[self.PRICE_COLUMNS]
+            keep = ~store.index.get_level_values('Ticker').isin(list(self._pending))
+            store = pd.concat([store[keep], new]).sort_index()
+
+            os.makedirs(self.store_path, exist_ok=True)
+            store.reset_index().to_parquet(self._store_filepath(), index=False)
+            coverage = {t: [str(s.date()), str(e.date())] for t, (s, e) in self._load_coverage().items()}
+            with open(self._coverage_filepath(), 'w') as f:
+                json.dump(coverage, f)
+            self._store = store
+            self._close_panel = None
+            self._pending = {}
+
+    def _write_store(self, ticker: str, data: pd.DataFrame):
+        with self._lock:
+            self._pending[ticker] = data
+            self._flush_store()
+
+    def _read_raw_csv(self, ticker: str) -> Union[pd.DataFrame, None]:
         filepath = self._raw_filepath(ticker)
+        if not os.path.exists(filepath):
+            return None
+        return pd.read_csv(filepath, index_col='Date', parse_dates=True)
+
+    def _cached_prices(self, ticker: str) -> Union[pd.DataFrame, None]:
+        """
+        Returns every cached bar for a ticker, looking in pending writes, the
+        columnar store and finally the legacy per-ticker CSVs (which are
+        migrated into the store on first use).
+        """
+        with self._lock:
+            if ticker in self._pending:
+                return self._pending[ticker]
 
-        if os.path.exists(filepath):
-            data = pd.read_csv(filepath, index_col='Date', parse_dates=True)
-            sliced_data = data.loc[start:end]
-            if not sliced_data.empty:
-                return sliced_data
+            store = self._load_store()
+            if ticker in store.index:
+                return store.loc[ticker]
 
-        data = yf.download(ticker, start=start, end=end, progress=False)
+        # Parsed outside the lock so get_multiple_data decodes legacy CSVs in parallel
+        data = self._read_raw_csv(ticker)
+        if data is not None:
+            data = data[self.PRICE_COLUMNS]
+            self._write_store(ticker, data)
+        return data
+
+    def _yf_download(self, ticker: str, start, end) -> Union[pd.DataFrame, None]:
+        # Ticker.history keeps its state per object; yf.download shares module globals
+        # between calls and is not safe to run from several threads
+        data = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=True)
         if data.empty:
             return None
         data.dropna(inplace=True)
-        if 'Adj Close' in data.columns:
-            data.drop(columns=['Adj Close'], inplace=True)
-        #data.rename(columns={'Open': 'open','High': 'high','Low': 'low','Close': 'close','Volume': 'volume'}, inplace=True)
-        #required_cols = ['open', 'high', 'low', 'close', 'volume']
-        #data = data[required_cols]
-        data = data.droplevel('Ticker', axis=1)
-        data.reset_index(inplace=True)
-        data.index = data['Date']
-        del data['Date']
+        data.index = data.index.tz_localize(None)
         data.index.name = 'Date'
-        data.to_csv(filepath)
-        return data.loc[start:end]
+        return data[self.PRICE_COLUMNS]
+
+    def _download(self, ticker: str, start, end) -> Union[pd.DataFrame, None]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.downloader(ticker, start, end)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def get_data(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """
+        Returns OHLCV bars between start and end. Only the head/tail segments outside
+        the cached coverage are downloaded, and they are appended to the store.
+        """
+        ticker = ticker.replace('.', '-')
+
+        cached = self._cached_prices(ticker)
+        segments = self._missing_segments(ticker, start, end, cached)
+
+        if segments:
+            frames = [cached] if cached is not None else []
+            fetched_segments = []
+            for seg_start, seg_end in segments:
+                try:
+                    fetched = self._download(ticker, seg_start, seg_end)
+                except Exception as e:
+                    print(f"[!] Failed to download {ticker} {seg_start.date()} -> {seg_end.date()}: {e}")
+                    self.failures[ticker] = str(e)
+                    continue
+                fetched_segments.append((seg_start, seg_end))
+                if fetched is not None:
+                    frames.append(fetched)
 
+            if frames:
+                cached = pd.concat(frames)
+                cached = cached[~cached.index.duplicated(keep='last')].sort_index()
+
+            if fetched_segments:
+                today = pd.Timestamp.today().normalize()
+                with self._lock:
+                    coverage = self._load_coverage()
+                    cov_start, cov_end = coverage.get(ticker, fetched_segments[0])
+                    cov_start = min([cov_start] + [s for s, _ in fetched_segments])
+                    cov_end = max([cov_end] + [min(e, today) for _, e in fetched_segments])
+                    coverage[ticker] = (cov_start, cov_end)
+                    if cached is not None:
+                        self._write_store(ticker, cached)
+
+        if cached is None:
+            return None
+        sliced_data = cached.loc[start:end]
+        return sliced_data if not sliced_data.empty else None
 
-    def get_multiple_data(self, tickers: List[str], start: str, end: str) -> dict:
-        data_dict = {}
-        for ticker in tickers:
+
+    def _get_data_reported(self, ticker: str, start: str, end: str) -> Union[pd.DataFrame, None]:
+        key = ticker.replace('.', '-')
+        self.failures.pop(key, None)
+        try:
             df = self.get_data(ticker, start, end)
-            if df is not None:
-                data_dict[ticker] = df
+        except Exception as e:
+            print(f"[!] Failed to load {ticker}: {e}")
+            self.failures[key] = str(e)
+            return None
+        if df is None:
+            self.failures.setdefault(key, "no data for the requested range")
+        return df
+
+    def get_multiple_data(self, tickers: List[str], start: str, end: str, max_workers: int = None) -> dict:
+        """
+        Loads several tickers on a bounded thread pool so downloads for cache misses
+        overlap and cache hits are decoded in parallel. Tickers that could not be
+        loaded are left out of the result and recorded in self.failures.
+        """
+        max_workers = self.max_workers if max_workers is None else max_workers
+        results = {}
 
-        return data_dict
+        # Batch store writes so a cold universe load rewrites the parquet file once
+        with self._lock:
+            self._defer_flush += 1
+        try:
+            if max_workers <= 1 or len(tickers) <= 1:
+                for ticker in tickers:
+                    results[ticker] = self._get_data_reported(ticker, start, end)
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    futures = {pool.submit(self._get_data_reported, ticker, start, end): ticker for ticker in tickers}
+                    for future in as_completed(futures):
+                        results[futures[future]] = future.result()
+        finally:
+            with self._lock:
+                self._defer_flush -= 1
+            self._flush_store()
+
+        return {ticker: results[ticker] for ticker in tickers if results.get(ticker) is not None}
     
+    def get_close_panel(self, tickers: List[str], start: str, end: str) -> pd.DataFrame:
+        """
+        Returns a Date x Ticker frame of close prices. Tickers already in the store
+        are sliced out of it in one vectorized pass; only the rest go through get_data.
+        """
+        tickers = [t.replace('.', '-') for t in tickers]
+        coverage = self._load_coverage()
+        # Uncovered tickers (e.g. legacy CSVs not migrated yet) all go to get_multiple_data,
+        # which decodes them in parallel and rewrites the store once for the whole batch
+        stale = [t for t in tickers if t not in coverage or self._missing_segments(t, start, end, None)]
+        if stale:
+            self.get_multiple_data(stale, start, end)
+
+        if self._close_panel is None:
+            panel = self._load_store()['Close'].unstack(level='Ticker')
+            panel.columns.name = None
+            self._close_panel = panel
+
+        panel = self._close_panel.loc[start:end]
+        available = [t for t in dict.fromkeys(tickers) if t in panel.columns]
+        if not available:
+            return pd.DataFrame()
+        return panel[available].dropna(how='all')
+
+    @staticmethod
+    def _parse_sp500_tables(tables: List[pd.DataFrame], snapshot_date: pd.Timestamp) -> pd.DataFrame:
+        """
+        Turns the Wikipedia constituents table and its "selected changes" table into rows of
+        (Date, Ticker, Change): 'member' rows dated snapshot_date for the current list, and
+        'added' / 'removed' rows for the change history.
+        """
+        current = tables[0]
+        members = pd.DataFrame({'Date': snapshot_date, 'Ticker': current['Symbol'].astype(str).str.strip(), 'Change': 'member'})
+
+        events = []
+        if len(tables) > 1:
+            changes = tables[1]
+            columns = [' '.join(map(str, c)) if isinstance(c, tuple) else str(c) for c in changes.columns]
+            date_col = next(i for i, c in enumerate(columns) if 'Date' in c)
+            for change, side in (('added', 'Added'), ('removed', 'Removed')):
+                ticker_col = next((i for i, c in enumerate(columns) if side in c and 'Ticker' in c), None)
+                if ticker_col is None:
+                    continue
+                events.append(pd.DataFrame({
+                    'Date': pd.to_datetime(changes.iloc[:, date_col], errors='coerce', format='mixed'),
+                    'Ticker': changes.iloc[:, ticker_col],
+                    'Change': change,
+                }))
+
+        # Members whose addition predates the changes table still get an 'added' row from "Date added"
+        if 'Date added' in current:
+            events.append(pd.DataFrame({
+                'Date': pd.to_datetime(current['Date added'].astype(str).str[:10], errors='coerce', format='mixed'),
+                'Ticker': members['Ticker'],
+                'Change': 'added',
+            }))
+
+        history = pd.concat(events) if events else pd.DataFrame(columns=['Date', 'Ticker', 'Change'])
+        history = history.dropna(subset=['Date', 'Ticker'])
+        history['Ticker'] = history['Ticker'].astype(str).str.strip()
+        history = history[history['Ticker'] != ''].drop_duplicates(['Ticker', 'Change', 'Date'])
+        return pd.concat([members, history]).sort_values(['Date', 'Change', 'Ticker']).reset_index(drop=True)
+
+    def refresh_sp500_constituents(self, source: str = None) -> pd.DataFrame:
+        """
+        Rebuilds data/store/sp500_constituents.parquet from the Wikipedia S&P 500 page.
+
+        :param source: URL or local HTML file of the page (e.g. a saved fixture). Defaults to SP500_URL.
+        :return: The stored (Date, Ticker, Change) rows.
+        """
+        source = source or self.SP500_URL
+        if '://' not in source and not os.path.exists(source):
+            raise FileNotFoundError(f"No S&P 500 page at {source}")
+        tables = pd.read_html(source)
+        snapshot_date = pd.Timestamp.today().normalize()
+        if os.path.exists(source):
+            snapshot_date = pd.Timestamp(os.path.getmtime(source), unit='s').normalize()
+        constituents = self._parse_sp500_tables(tables, snapshot_date)
+
+        with self._lock:
+            os.makedirs(self.store_path, exist_ok=True)
+            constituents.to_parquet(self._constituents_filepath(), index=False)
+            self._constituents = constituents
+        return constituents
+
+    def _load_constituents(self) -> pd.DataFrame:
+        """
+        Reads the constituent store once per loader; the first call without one scrapes SP500_URL.
+        """
+        with self._lock:
+            if self._constituents is None:
+                filepath = self._constituents_filepath()
+                if os.path.exists(filepath):
+                    self._constituents = pd.read_parquet(filepath)
+                else:
+                    print(f"[!] No S&P 500 constituent store at {filepath}, fetching it from {self.SP500_URL}")
+                    try:
+                        self.refresh_sp500_constituents()
+                    except Exception as e:
+                        raise RuntimeError(
+                            f"Could not build the S&P 500 constituent store ({e}). "
+                            "Run `python -m data.data_loader --sp500 <saved page.html>` to build it offline."
+                        ) from e
+            return self._constituents
+
+    def get_sp500_changes(self) -> pd.DataFrame:
+        """
+        Dated index changes from the constituent store, oldest first.
+
+        :return: DataFrame with 'Date', 'Ticker' and 'Change' ('added' / 'removed') columns.
+        """
+        constituents = self._load_constituents()
+        return constituents[constituents['Change'] != 'member'].reset_index(drop=True)
+
+    def get_sp500_tickers(self, as_of: str = None) -> List[str]:
+        """
+        S&P 500 members from the cached constituent store.
+
+        :param as_of: Optional date; the current list is rolled back through every later change,
+                      so removed tickers come back and later additions drop out.
+        """
+        constituents = self._load_constituents()
+        is_member = constituents['Change'] == 'member'
+        members = constituents.loc[is_member, 'Ticker'].tolist()
+        if as_of is None:
+            return members
+
+        # Each ticker's first change after as_of says whether it was in the index before it
+        changes = constituents[~is_member & (constituents['Date'] > pd.Timestamp(as_of))]
+        first = changes.sort_values('Date', kind='stable').drop_duplicates('Ticker', keep='first')
+        added_later = set(first.loc[first['Change'] == 'added', 'Ticker'])
+        removed_later = first.loc[first['Change'] == 'removed', 'Ticker']
+        return [t for t in members if t not in added_later] + sorted(set(removed_later) - set(members))
+
     def get_sp500_data(self, start: str, end: str):
-        sp500 = pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")[0]
-        sp500 = sp500['Symbol'].to_list()
+        sp500 = self.get_sp500_tickers()
         data = self.get_multiple_data(sp500, start, end)
         return data
 
     def get_sp500_data_df(self, start: str, end: str) -> pd.DataFrame:
-        tickers = pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")[0]['Symbol'].tolist()
-        tickers = [t.replace('.', '-') for t in tickers]
-        data_dict = self.get_multiple_data(tickers, start, end)
-        close_prices = [df[['Close']].rename(columns={'Close': ticker}) for ticker, df in data_dict.items()]
-        return pd.concat(close_prices, axis=1) if close_prices else pd.DataFrame()
+        tickers = self.get_sp500_tickers()
+        return self.get_close_panel(tickers, start, end)
+
+    def migrate_raw_to_store(self) -> int:
+        """
+        One-shot migration of every data/raw/<TICKER>.csv into the columnar store.
+        Returns the number of tickers written.
+        """
+        frames = {}
+        for filepath in sorted(glob.glob(os.path.join(self.raw_path, "*.csv"))):
+            ticker = os.path.splitext(os.path.basename(filepath))[0]
+            try:
+                frames[ticker] = self._read_raw_csv(ticker)[self.PRICE_COLUMNS]
+            except Exception as e:
+                print(f"[!] Failed to migrate {ticker}: {e}")
+
+        self._pending.update(frames)
+        self._flush_store()
+        return len(frames)
     
     def get_fundamentals(self, ticker):
         ticker = ticker.replace('.', '-')
@@ -77,11 +491,198 @@ class data_loader:
             except Exception as e:
                 print(f"[!] Failed to load fundamentals from file for {ticker}: {e}")
 
-        try:
-            fundamentals = yf.Ticker(ticker).info
+        fundamentals = self._fetch_fundamentals(ticker)
+        if fundamentals:
             with open(file_path, 'w') as f:
                 json.dump(fundamentals, f)
-            return fundamentals
+        return fundamentals
+
+    def _fetch_fundamentals(self, ticker):
+        ticker = ticker.replace('.', '-')
+        try:
+            self.fundamentals_limiter.acquire()
+            return yf.Ticker(ticker).info
         except Exception as e:
             print(f"[!] Failed to download fundamentals for {ticker}: {e}")
             return {}
+
+    def get_multiple_fundamentals(self, tickers: List[str], max_workers: int = None, refresh: bool = False) -> dict:
+        """
+        Loads fundamentals for several tickers on a thread pool. Cached JSON files are
+        read in parallel; only network calls go through the rate limiter.
+
+        :param refresh: Skip the JSON cache and fetch every ticker from yfinance.
+        """
+        max_workers = self.max_workers if max_workers is None else max_workers
+        fetch = self._fetch_fundamentals if refresh else self.get_fundamentals
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return dict(zip(tickers, pool.map(fetch, tickers)))
+
+    def _load_fundamentals_store(self) -> pd.DataFrame:
+        with self._lock:
+            if self._fundamentals is None:
+                filepath = self._fundamentals_filepath()
+                if os.path.exists(filepath):
+                    self._fundamentals = pd.read_parquet(filepath)
+                else:
+                    self._fundamentals = pd.DataFrame({
+                        'Date': pd.Series(dtype='datetime64[ns]'),
+                        'Ticker': pd.Series(dtype=object),
+                        **{field: pd.Series(dtype=float) for field in self.FUNDAMENTAL_FIELDS},
+                    })
+            return self._fundamentals
+
+    def _ensure_fundamentals(self, tickers: List[str]):
+        """
+        Builds a snapshot of the tickers when the store has none of them yet (e.g. on a fresh checkout,
+        where data/store is empty), so point-in-time lookups have something to screen on.
+        """
+        names = list(dict.fromkeys(t.replace('.', '-') for t in tickers))
+        store = self._load_fundamentals_store()
+        if not names or store['Ticker'].isin(names).any():
+            return
+        missing = [t for t in names if t not in self._fundamentals_failed]
+        if missing:
+            print(f"[!] The fundamentals store has none of these {len(names)} tickers, building a snapshot of them now.")
+            self.build_fundamentals_snapshot(missing)
+
+    def build_fundamentals_snapshot(self, tickers: List[str], date: str = None, refresh: bool = False, archive_raw: bool = False) -> pd.DataFrame:
+        """
+        Appends a dated snapshot of FUNDAMENTAL_FIELDS for the tickers to data/store/fundamentals.parquet.
+
+        :param date: Snapshot date. Defaults to the latest regularMarketTime of the build (the day yfinance
+                     produced the newest data), so the whole build is stamped with one date and nothing is
+                     dated before it was known.
+        :param refresh: Fetch live from yfinance instead of using cached _fundamentals.json files.
+        :param archive_raw: Also keep the full .info blobs in data/store/fundamentals_raw/<date>.json.gz.
+        :return: The snapshot rows that were written, indexed by ticker.
+        """
+        tickers = list(dict.fromkeys(t.replace('.', '-') for t in tickers))
+        infos = {t: info for t, info in self.get_multiple_fundamentals(tickers, refresh=refresh).items() if info}
+        with self._lock:
+            self._fundamentals_failed.difference_update(infos)
+            self._fundamentals_failed.update(t for t in tickers if t not in infos)
+
+        today = pd.Timestamp.today().normalize()
+        if date is None:
+            times = [info['regularMarketTime'] for info in infos.values() if info.get('regularMarketTime')]
+            date = pd.Timestamp(max(times), unit='s').normalize() if times else today
+        date = pd.Timestamp(date).as_unit('ns')
+
+        snapshot = pd.DataFrame.from_dict(infos, orient='index', columns=self.FUNDAMENTAL_FIELDS)
+        snapshot = snapshot.apply(pd.to_numeric, errors='coerce').astype(float)
+        snapshot.insert(0, 'Date', date)
+        snapshot.index.name = 'Ticker'
+
+        if snapshot.empty:
+            return snapshot
+
+        with self._lock:
+            store = self._load_fundamentals_store()
+            new = snapshot.reset_index()
+            store = pd.concat([store, new]) if not store.empty else new
+            store = store.drop_duplicates(['Date', 'Ticker'], keep='last').sort_values(['Date', 'Ticker'])
+            os.makedirs(self.store_path, exist_ok=True)
+            store.to_parquet(self._fundamentals_filepath(), index=False)
+            self._fundamentals = store.reset_index(drop=True)
+
+        if archive_raw:
+            archive_dir = os.path.join(self.store_path, "fundamentals_raw")
+            os.makedirs(archive_dir, exist_ok=True)
+            with gzip.open(os.path.join(archive_dir, f"{date.date()}.json.gz"), 'wt') as f:
+                json.dump(infos, f)
+
+        return snapshot
+
+    def get_fundamentals_snapshot(self, tickers: List[str] = None, as_of: str = None) -> pd.DataFrame:
+        """
+        Returns the point-in-time fundamentals table: for every ticker the latest
+        snapshot dated on or before as_of. Without as_of, tickers that have no
+        snapshot yet are added from the cache (or yfinance) first; tickers a build
+        already got nothing for are not retried, call build_fundamentals_snapshot
+        to fetch them again. With as_of, a snapshot is only built when the store
+        has none of the tickers at all.
+
+        :return: DataFrame indexed by ticker with a 'Date' column and float FUNDAMENTAL_FIELDS columns.
+        """
+        if tickers is not None:
+            self._ensure_fundamentals(tickers)
+        store = self._load_fundamentals_store()
+        if tickers is not None and as_of is None:
+            known = set(store['Ticker'])
+            skip = known | self._fundamentals_failed
+            missing = [t for t in tickers if t.replace('.', '-') not in skip]
+            if missing:
+                self.build_fundamentals_snapshot(missing)
+                store = self._load_fundamentals_store()
+
+        if as_of is not None:
+            store = store[store['Date'] <= pd.Timestamp(as_of)]
+        latest = store.sort_values('Date').drop_duplicates('Ticker', keep='last').set_index('Ticker')
+
+        if tickers is None:
+            return latest.sort_index()
+        snapshot = latest.reindex([t.replace('.', '-') for t in tickers])
+        snapshot.index = pd.Index(tickers, name='Ticker')
+        return snapshot
+
+    def get_fundamentals_start(self, tickers: List[str] = None) -> pd.Series:
+        """
+        Date of the first fundamentals snapshot of every ticker.
+
+        :return: Series of dates indexed by ticker; NaT for tickers without any snapshot.
+        """
+        if tickers is not None:
+            self._ensure_fundamentals(tickers)
+        store = self._load_fundamentals_store()
+        first = store.groupby('Ticker')['Date'].min()
+        if tickers is None:
+            return first
+        start = first.reindex([t.replace('.', '-') for t in tickers])
+        start.index = pd.Index(tickers, name='Ticker')
+        return start
+
+    def get_fundamentals_history(self, tickers: List[str], dates) -> pd.DataFrame:
+        """
+        Point-in-time fundamentals for several dates at once: for every (date, ticker) the latest
+        snapshot dated on or before that date, found with a single as-of merge.
+
+        :return: DataFrame indexed by (Date, Ticker) with a 'Snapshot Date' column and FUNDAMENTAL_FIELDS columns;
+                 rows without any snapshot that old are NaN.
+        """
+        names = {t.replace('.', '-'): t for t in tickers}
+        self._ensure_fundamentals(tickers)
+        store = self._load_fundamentals_store()
+        snapshots = store[store['Ticker'].isin(list(names))].rename(columns={'Date': 'Snapshot Date'})
+        grid = pd.MultiIndex.from_product([pd.DatetimeIndex(sorted(dates)), list(names)], names=['Date', 'Ticker']).to_frame(index=False)
+        history = pd.merge_asof(
+            grid, snapshots.sort_values('Snapshot Date'),
+            left_on='Date', right_on='Snapshot Date', by='Ticker', direction='backward'
+        )
+        history['Ticker'] = history['Ticker'].map(names)
+        return history.set_index(['Date', 'Ticker']).sort_index()
+
+
+if __name__ == "__main__":
+    # python -m data.data_loader                       -> migrate data/raw CSVs and _fundamentals.json files into data/store
+    # python -m data.data_loader --sp500 [page.html]   -> refresh the S&P 500 constituent store (from Wikipedia or a saved page)
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sp500', nargs='?', const=data_loader.SP500_URL, default=None, metavar='SOURCE',
+                        help="Refresh the S&P 500 constituent store from a URL or a local HTML file, then exit")
+    args = parser.parse_args()
+
+    loader = data_loader()
+    if args.sp500:
+        constituents = loader.refresh_sp500_constituents(args.sp500)
+        changes = loader.get_sp500_changes()
+        span = f" ({changes['Date'].min():%Y-%m-%d} to {changes['Date'].max():%Y-%m-%d})" if len(changes) else ""
+        print(f"✅ Stored {len(loader.get_sp500_tickers())} S&P 500 members and {len(changes)} dated changes{span}")
+        raise SystemExit
+    count = loader.migrate_raw_to_store()
+    print(f"✅ Migrated {count} tickers into the columnar price store")
+
+    fundamentals = glob.glob(os.path.join(loader.raw_path, "*_fundamentals.json"))
+    tickers = sorted(os.path.basename(p)[:-len("_fundamentals.json")] for p in fundamentals)
+    snapshot = loader.build_fundamentals_snapshot(tickers)
+    print(f"✅ Wrote a fundamentals snapshot for {len(snapshot)} tickers")
@@ -0,0 +1,225 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future, wait
+from typing import List
+
+import pandas as pd
+
+from data.data_loader import data_loader
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(len(str(v)) for v in value)
+    return 0
+
+
+class market_data:
+    """
+    Run-scoped market data shared by the benchmark and every strategy of a Portfolio.
+
+    Each ticker's price series and the S&P 500 constituent list reach data_loader once per run;
+    later requests are sliced from memory. load_counts, request_counts and memory_bytes record what
+    was actually loaded; memory_bytes is the in-memory size of the loaded frames, not bytes read
+    from disk. Anything not cached here (fundamentals, store maintenance) is passed through to the
+    wrapped loader, so a market_data can stand in for a data_loader.
+
+    The lock only guards the cache itself; loads run outside it. A key being loaded is marked with
+    a Future, so concurrent requests for it wait for that load while other keys load in parallel.
+    """
+
+    def __init__(self, loader: data_loader = None):
+        self.loader = loader or data_loader()
+        self.load_counts = Counter()       # key -> loads that went to data_loader
+        self.request_counts = Counter()    # key -> requests served
+        self.memory_bytes = Counter()      # key -> in-memory bytes of what was loaded
+        self._prices = {}                  # ticker -> (start, end, OHLCV frame)
+        self._panels = {}                  # (tickers, start, end) -> close panel
+        self._constituents = None
+        self._inflight = {}                # key -> Future resolved when its load is stored
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        if name == 'loader':
+            raise AttributeError(name)
+        return getattr(self.loader, name)
+
+    def _record(self, key: str, value, loaded: bool):
+        self.request_counts[key] += 1
+        if loaded:
+            self.load_counts[key] += 1
+            self.memory_bytes[key] += _nbytes(value)
+
+    def _claim(self, keys) -> dict:
+        """
+        Marks the keys as being loaded by the caller. Call with the lock held.
+        """
+        futures = {key: Future() for key in keys}
+        self._inflight.update(futures)
+        return futures
+
+    def _release(self, futures: dict):
+        with self._lock:
+            for key in futures:
+                self._inflight.pop(key, None)
+        for future in futures.values():
+            future.set_result(None)
+
+    @staticmethod
+    def _bounds(start, end):
+        return pd.Timestamp(start), pd.Timestamp(end)
+
+    def _cached_range(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp):
+        cached = self._prices.get(ticker)
+        if cached is not None and cached[0] <= start and end <= cached[1]:
+            data = cached[2]
+            return data if data is None else data.loc[start:end]
+        return False
+
+    def get_data(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """
+        OHLCV frame for one ticker; loaded once, then sliced from the widest range requested so far.
+        """
+        start, end = self._bounds(start, end)
+        while True:
+            with self._lock:
+                data = self._cached_range(ticker, start, end)
+                if data is not False:
+                    self._record(ticker, data, loaded=False)
+                    return data
+                pending = self._inflight.get(ticker)
+                if pending is None:
+                    claimed = self._claim([ticker])
+                    cached = self._prices.get(ticker)
+                    lo, hi = (min(start, cached[0]), max(end, cached[1])) if cached is not None else (start, end)
+            if pending is not None:
+                wait([pending])
+                continue
+            try:
+                data = self.loader.get_data(ticker, lo, hi)
+                with self._lock:
+                    self._prices[ticker] = (lo, hi, data)
+                    self._record(ticker, data, loaded=True)
+            finally:
+                self._release(claimed)
+            return data if data is None else data.loc[start:end]
+
+    def get_multiple_data(self, tickers: List[str], start: str, end: str, max_workers: int = None) -> dict:
+        """
+        Like data_loader.get_multiple_data; tickers not in memory yet are fetched in one concurrent batch
+        (one per distinct range when some are already cached over a different window).
+        """
+        start, end = self._bounds(start, end)
+        loaded = set()
+        while True:
+            with self._lock:
+                missing = [t for t in tickers if self._cached_range(t, start, end) is False]
+                pending = [self._inflight[t] for t in missing if t in self._inflight]
+                claimed = self._claim([t for t in missing if t not in self._inflight])
+                # Tickers already cached over another window load the union, like get_data
+                ranges = {}
+                for ticker in claimed:
+                    cached = self._prices.get(ticker)
+                    bounds = (min(start, cached[0]), max(end, cached[1])) if cached is not None else (start, end)
+                    ranges.setdefault(bounds, []).append(ticker)
+            if not missing:
+                break
+            if claimed:
+                try:
+                    for (lo, hi), group in ranges.items():
+                        batch = self.loader.get_multiple_data(group, lo, hi, max_workers)
+                        with self._lock:
+                            for ticker in group:
+                                data = batch.get(ticker)
+                                self._prices[ticker] = (lo, hi, data)
+                                self._record(ticker, data, loaded=True)
+                    loaded.update(claimed)
+                finally:
+                    self._release(claimed)
+            wait(pending)
+
+        results = {}
+        with self._lock:
+            for ticker in tickers:
+                data = self._cached_range(ticker, start, end)
+                if ticker not in loaded:
+                    self._record(ticker, data, loaded=False)
+                if data is not None:
+                    results[ticker] = data
+        return results
+
+    def get_close_panel(self, tickers: List[str], start: str, end: str) -> pd.DataFrame:
+        """
+        Date x Ticker close panel, built once per (tickers, window).
+        """
+        key = (tuple(tickers), *self._bounds(start, end))
+        label = f"close panel ({len(tickers)} tickers)"
+        while True:
+            with self._lock:
+                panel = self._panels.get(key)
+                if panel is not None:
+                    self._record(label, panel, loaded=False)
+                    return panel
+                pending = self._inflight.get(key)
+                if pending is None:
+                    claimed = self._claim([key])
+            if pending is not None:
+                wait([pending])
+                continue
+            try:
+                panel = self.loader.get_close_panel(list(tickers), start, end)
+                with self._lock:
+                    self._panels[key] = panel
+                    self._record(label, panel, loaded=True)
+            finally:
+                self._release(claimed)
+            return panel
+
+    def get_sp500_tickers(self, as_of: str = None) -> List[str]:
+        """
+        S&P 500 constituent list, read once per run. Point-in-time lists (as_of) come straight from the loader's store.
+        """
+        if as_of is not None:
+            return self.loader.get_sp500_tickers(as_of)
+        key = 'S&P 500 constituents'
+        while True:
+            with self._lock:
+                if self._constituents is not None:
+                    self._record(key, self._constituents, loaded=False)
+                    return list(self._constituents)
+                pending = self._inflight.get(key)
+                if pending is None:
+                    claimed = self._claim([key])
+            if pending is not None:
+                wait([pending])
+                continue
+            try:
+                constituents = self.loader.get_sp500_tickers()
+                with self._lock:
+                    self._constituents = constituents
+                    self._record(key, constituents, loaded=True)
+            finally:
+                self._release(claimed)
+            return list(constituents)
+
+    def get_sp500_data_df(self, start: str, end: str) -> pd.DataFrame:
+        return self.get_close_panel(self.get_sp500_tickers(), start, end)
+
+    def report(self) -> pd.DataFrame:
+        """
+        Loads, requests and in-memory bytes per key, largest first, plus a printed one-line total.
+        """
+        table = pd.DataFrame({
+            'Loads': pd.Series(self.load_counts, dtype=int),
+            'Requests': pd.Series(self.request_counts, dtype=int),
+            'Memory Bytes': pd.Series(self.memory_bytes, dtype=int),
+        }).fillna(0).astype(int).sort_values('Memory Bytes', ascending=False)
+        print(f"Market data: {table['Loads'].sum()} loads for {table['Requests'].sum()} requests, "
+              f"{table['Memory Bytes'].sum() / 1e6:.1f} MB loaded into memory")
+        return table
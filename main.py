@@ -1,18 +1,20 @@
 from reporting.generate_report import generate_report, generate_pdf
-import pandas as pd
+from data.market_data import market_data
 
 start_date = '2020-01-01'
 end_date = '2025-01-01'
 user_risk_tol = 'medium'
 user_time_hor = 'medium'
 mean_tickers = ['CL=F']
-tickers = pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")[0]['Symbol'].tolist()
+market = market_data()   # shared by every component of the run, so each series is loaded once
+tickers = market.get_sp500_tickers()
 factor_tickers = [t.replace('.', '-') for t in tickers]
 commissions = 0.001
 cash = 1000000
 
 
-generate_report(start_date, end_date, user_risk_tol, user_time_hor, mean_tickers, factor_tickers, commissions, cash)
+generate_report(start_date, end_date, user_risk_tol, user_time_hor, mean_tickers, factor_tickers, commissions, cash, market)
+market.report()
 
 
 #----------- IN PROGRESS ------------
@@ -0,0 +1,106 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+BOOTSTRAP_METRICS = ['CAGR [%]', 'Sharpe Ratio', 'Max. Drawdown [%]']
+
+# Return matrix sent once to each bootstrap worker
+_BOOT_RETURNS = None
+
+
+def _init_bootstrap_worker(returns):
+    global _BOOT_RETURNS
+    _BOOT_RETURNS = returns
+
+
+def block_bootstrap_indices(n: int, block_length: int, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Row indices of circular block bootstrap resamples: each resample strings together blocks of
+    block_length consecutive rows from random starts (wrapping around the end), cut to n rows.
+
+    :return: Integer array (n_resamples x n).
+    """
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks, 1))
+    return ((starts + np.arange(block_length)) % n).reshape(n_resamples, -1)[:, :n]
+
+
+def path_metrics(returns: np.ndarray, periods_per_year: int = 252, risk_free_rate: float = 0.0) -> dict:
+    """
+    CAGR, Sharpe ratio and max drawdown of many return paths at once, with performance_metrics' definitions.
+
+    :param returns: Simple returns without NaN, periods along the last axis (... x periods).
+    :return: Dict of metric: array of the leading shape.
+    """
+    n = returns.shape[-1]
+    wealth = np.cumprod(1 + returns, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cagr = wealth[..., -1] ** (periods_per_year / n) - 1
+        volatility = returns.std(axis=-1, ddof=1) * np.sqrt(periods_per_year)
+        sharpe = (cagr - risk_free_rate) / volatility
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=-1), 1.0)
+    max_dd = np.minimum((wealth / peak - 1).min(axis=-1), 0.0)
+    return {'CAGR [%]': cagr * 100, 'Sharpe Ratio': sharpe, 'Max. Drawdown [%]': max_dd * 100}
+
+
+def _bootstrap_chunk(task, returns: np.ndarray = None) -> dict:
+    """
+    Metrics of one chunk of resamples; every series is resampled on the same rows to keep their correlation.
+    """
+    seed, n_resamples, block_length, periods_per_year, risk_free_rate = task
+    returns = _BOOT_RETURNS if returns is None else returns
+    rng = np.random.default_rng(seed)
+    rows = block_bootstrap_indices(len(returns), block_length, n_resamples, rng)
+    resampled = np.moveaxis(returns[rows], 1, -1)       # resamples x series x periods
+    return path_metrics(resampled, periods_per_year, risk_free_rate)
+
+
+def bootstrap_metrics(returns, n_resamples: int = 1000, block_length: int = 21, confidence: float = 0.95,
+                      periods_per_year: int = 252, risk_free_rate: float = 0.0, seed: int = None,
+                      processes: int = None, chunk_size: int = 250) -> pd.DataFrame:
+    """
+    Block-bootstrap confidence intervals of CAGR, Sharpe ratio and max drawdown for every series.
+
+    Resamples are drawn in chunks, each scored in one vectorized pass and fanned out to a process
+    pool. Every chunk gets its own child of the seed, so a given seed gives the same intervals
+    whatever the number of processes.
+
+    :param returns: Daily simple returns, a Series or a DataFrame with one column per series. Rows with a NaN are dropped.
+    :param n_resamples: Number of bootstrap resamples.
+    :param block_length: Rows per block; keeps volatility clustering and autocorrelation up to that length.
+    :param confidence: Two-sided confidence level of the percentile intervals.
+    :param seed: Seed of the random generator, for reproducible reports.
+    :param processes: Pool size; defaults to os.cpu_count(). 1 runs in-process.
+    :param chunk_size: Resamples per task, which bounds memory to chunk_size x rows x series floats.
+    :return: DataFrame indexed by (Series, Metric) with 'Estimate', 'Lower', 'Upper' and 'Std. Error' columns.
+    """
+    frame = (returns.to_frame() if isinstance(returns, pd.Series) else returns).dropna()
+    values = frame.to_numpy(dtype=float)
+
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, block_length, periods_per_year, risk_free_rate) for s, size in zip(seeds, sizes)]
+
+    if processes == 1 or len(tasks) == 1:
+        chunks = [_bootstrap_chunk(task, values) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_bootstrap_worker, initargs=(values,)) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, tasks))
+
+    estimate = path_metrics(values.T, periods_per_year, risk_free_rate)
+    alpha = (1 - confidence) / 2
+    tables = {}
+    for metric in BOOTSTRAP_METRICS:
+        samples = np.concatenate([chunk[metric] for chunk in chunks])       # resamples x series
+        lower, upper = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+        tables[metric] = pd.DataFrame({
+            'Estimate': estimate[metric],
+            'Lower': lower,
+            'Upper': upper,
+            'Std. Error': np.nanstd(samples, axis=0, ddof=1),
+        }, index=frame.columns)
+
+    table = pd.concat(tables, names=['Metric', 'Series']).swaplevel()
+    return table.reindex(pd.MultiIndex.from_product([frame.columns, BOOTSTRAP_METRICS], names=['Series', 'Metric']))
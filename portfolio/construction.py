@@ -6,16 +6,109 @@ from Strategies.factor_investing import factor_investing_strategy, factor_invest
 from Strategies.momentum import momentum_strategy
 from Strategies.mean_reversion import mean_reversion_strategy
 from backtester.engine import GenericBacktestEngine
-from data.data_loader import data_loader
+from data.market_data import market_data
+from portfolio.metrics import performance_metrics, regression_metrics
+from portfolio.simulation import allocation_grid, efficient_set, simulate_portfolios
+from portfolio.bootstrap import bootstrap_metrics
 import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
 
 
 
+def walk_forward_folds(start, end, train_months: int = 24, test_months: int = 6) -> list:
+    """
+    Splits [start, end] into rolling (train_start, test_start, test_end) folds.
+    Test windows are consecutive and half-open, so their out-of-sample returns stitch without overlap.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    folds = []
+    test_start = start + pd.DateOffset(months=train_months)
+    while test_start < end:
+        test_end = min(test_start + pd.DateOffset(months=test_months), end)
+        folds.append((test_start - pd.DateOffset(months=train_months), test_start, test_end))
+        test_start = test_end
+    return folds
+
+
+# Price data loaded once by the parent and attached to each fold worker
+_FOLD_DATA = None
+
+
+def _init_fold_worker(shared):
+    global _FOLD_DATA
+    _FOLD_DATA = shared
+
+
+def _run_fold(fold: dict, shared: dict = None) -> dict:
+    """
+    Runs every strategy on one walk-forward fold and returns its out-of-sample simple returns.
+
+    Mean reversion is tuned on the train window (when a param grid is given), then traded from the
+    train start so indicators are warm, keeping only test-window returns. Momentum uses the train
+    window as lookback history. Factor investing holds the stocks screened at the test start.
+    Every strategy's returns are daily.
+    """
+    shared = _FOLD_DATA if shared is None else shared
+    train_start, test_start, test_end = fold['train_start'], fold['test_start'], fold['test_end']
+    last = test_end + pd.Timedelta(days=1) if fold['last'] else test_end
+
+    def in_test(series):
+        return series[(series.index >= test_start) & (series.index < last)]
+
+    out = {'fold': fold['fold'], 'params': {}, 'returns': {}}
+
+    try:
+        engine = GenericBacktestEngine(mean_reversion_strategy, cash=fold['mean_cash'], commission=fold['commissions'])
+        history = {t: df[(df.index >= train_start) & (df.index < last)] for t, df in shared['ohlcv'].items()}
+        if fold['param_grid']:
+            train = {t: df[df.index < test_start] for t, df in history.items()}
+            table = engine.optimize(train, fold['param_grid'], processes=1, prune_after=0)
+            out['params'] = {k: table.at[0, k] for k in fold['param_grid']}
+            engine.strategy_kwargs = out['params']
+        mean_returns = pd.DataFrame({t: in_test(engine.run(df)[1]) for t, df in history.items()})
+        out['returns']['Mean Reversion'] = mean_returns.mean(axis=1)
+    except Exception as e:
+        print(f"[!] Mean reversion failed on fold {fold['fold']}: {e}")
+
+    try:
+        strategy = momentum_strategy(train_start, test_end, fold['momentum_equity'], fold['commissions'],
+                                     index_returns=shared['index_returns'])
+        panel = shared['momentum_panel']
+        _, momentum_returns = strategy.run(panel[(panel.index >= train_start) & (panel.index < last)])
+        out['returns']['Momentum'] = in_test(momentum_returns)
+    except Exception as e:
+        print(f"[!] Momentum failed on fold {fold['fold']}: {e}")
+
+    try:
+        prices = shared['factor_prices']
+        start_pos = max(prices.index.searchsorted(test_start) - 1, 0)   # prior close, so day one has a return
+        window = prices.iloc[start_pos:prices.index.searchsorted(last)]
+        strategy = factor_investing_strategy(window.index[0], window.index[-1], fold['commissions'], None, [])
+        _, factor_returns = strategy.backtest(tickers=fold['factor_tickers'], prices=window)
+        # The buy happens at the prior close; book its commission on the first test day
+        factor_returns.iloc[1] = (1 + factor_returns.iloc[0]) * (1 + factor_returns.iloc[1]) - 1
+        out['returns']['Factor Investing'] = in_test(factor_returns)
+    except Exception as e:
+        print(f"[!] Factor investing failed on fold {fold['fold']}: {e}")
+
+    return out
+
+
 class Portfolio:
 
-    def __init__(self, start, end, commissions, cash, mean_tickers, factor_tickers, user_tolerance: str='low', user_time: str='medium'):
+    def __init__(self, start, end, commissions, cash, mean_tickers, factor_tickers, user_tolerance: str='low', user_time: str='medium', market: market_data=None, rebalance: str='ME', allocation_method: str=None):
+        """
+        :param market: Optional market_data shared with the caller; every price series and the constituent
+                       list are then loaded once for the whole run. A fresh one is created by default.
+        :param rebalance: Pandas offset alias at which the combined portfolio is reset to the sleeve allocations
+                          (None lets the sleeves drift).
+        :param allocation_method: Optional RiskManagement optimizer ('mean_variance', 'risk_parity', 'min_cvar');
+                                  the allocations are then re-solved from the sleeve returns on every backtest_portfolio.
+        """
         self.risk_manager = RiskManagement(user_tolerance, user_time)
 
         self.mean_alloc, self.momentum_alloc, self.factor_alloc = self._get_strategy_allocations()
@@ -27,13 +120,16 @@ class Portfolio:
         self.end = end
         self.commissions = commissions
         self.cash = cash
+        self.rebalance = rebalance
+        self.allocation_method = allocation_method
 
         self.risk_manager = RiskManagement(user_tolerance, user_time)
-        self.benchmark = benchmark(start=start, end=end)
-        self.data_loader = data_loader()
+        self.market = market or market_data()
+        self.data_loader = self.market.loader
+        self.benchmark = benchmark(start=start, end=end, market=self.market)
 
-        self.factor_strategy = factor_investing_strategy(start, end, commissions, self.data_loader, self.factor_tickers)
-        self.momentum_strategy = momentum_strategy(start, end, self.momentum_alloc, commissions)
+        self.factor_strategy = factor_investing_strategy(start, end, commissions, self.market, self.factor_tickers)
+        self.momentum_strategy = momentum_strategy(start, end, self.momentum_alloc, commissions, market=self.market)
         self.mean_strategy = mean_reversion_strategy
 
 
@@ -45,16 +141,19 @@ class Portfolio:
 
         return mean_alloc, momentum_alloc, factor_alloc
     
-    def backtest_mean(self):
+    def backtest_mean(self, executor: Executor = None):
+        """
+        :param executor: Optional process pool the per-ticker backtests are fanned out to.
+        """
         engine = GenericBacktestEngine(
                     strategy_cls=self.mean_strategy,
                     cash=self.mean_alloc*self.cash,
                     commission=self.commissions
                 )    
-        data = self.data_loader.get_multiple_data(self.mean_tickers, self.start, self.end)
-        mean_reversion_results, pf_ret_dict = engine.batch_backtest(data)
-        first_df = list(data.values())[0]
-        self.mean_plot_path = engine.plot(first_df)
+        data = self.market.get_multiple_data(self.mean_tickers, self.start, self.end)
+        mean_reversion_results, pf_ret_dict = engine.batch_backtest(data, executor=executor)
+        first_ticker = next(iter(data))
+        self.mean_plot_path = engine.plot(data[first_ticker], first_ticker)
         
         return mean_reversion_results, pf_ret_dict
     
@@ -63,35 +162,29 @@ class Portfolio:
         return momentum_results, pf_ret
     
     def backtest_factor(self):
-        pf_cum, pf_ret = self.factor_strategy.backtest()
+        result = self.factor_strategy.backtest()
+        if result is None:
+            print("[!] Factor investing produced no returns, the sleeve is left out of the portfolio.")
+            return None, pd.Series(dtype=float)
+        pf_cum, pf_ret = result
         metrics = self.factor_strategy.get_metrics()
         return metrics, pf_ret
     
-    def _get_portfolio_results(self, mean_reversion_results, momentum_results, factor_results):
+    def _get_portfolio_results(self, mean_returns, momentum_results, factor_results, returns_df):
 
-        final_metrics = {}
         metrics = ['Return [%]', 'CAGR [%]', 'Sharpe Ratio', 'Max. Drawdown [%]']
 
-        metric_values = {metric: [] for metric in metrics}
-        traded_stocks = 0
-
-        sorted_results = sorted(mean_reversion_results.items(), key=lambda x: x[1]['Return [%]'], reverse=True)
-        
-
-        for ticker, stat in sorted_results:
-            if stat['Return [%]'] != 0:
-                traded_stocks += 1
-                for metric in metrics:
-                    val = stat.get(metric, np.nan)
-                    metric_values[metric].append(val)
+        # Mean reversion metrics come from each ticker's equity-curve returns, like every other sleeve's
+        ticker_stats = performance_metrics(pd.DataFrame(mean_returns), periods_per_year=252)
+        traded = ticker_stats[ticker_stats['Return [%]'] != 0]
 
         summary_stats = {}
 
-        for metric, values in metric_values.items():
-            clean_vals = [v for v in values if not (isinstance(v, float) and np.isnan(v))]
+        for metric in metrics:
+            clean_vals = traded[metric].dropna()
             summary_stats[metric] = {
-                'avg': np.mean(clean_vals) if clean_vals else np.nan,
-                'median': np.median(clean_vals) if clean_vals else np.nan
+                'avg': clean_vals.mean() if len(clean_vals) else np.nan,
+                'median': clean_vals.median() if len(clean_vals) else np.nan
             }
 
         mean_reversion_summary =  summary_stats
@@ -100,26 +193,120 @@ class Portfolio:
 
         factor_summary = factor_results
 
-        for metric in metrics:
-            # Extract values from each summary
-            mean_val = mean_reversion_summary.get(metric, {}).get('avg', np.nan)
-            momentum_val = momentum_summary.get(metric, np.nan)
-            factor_val = factor_summary.get(metric, np.nan)
-
-            # Weighted average of available metrics
-            weighted_values = [
-                mean_val * self.mean_alloc if not np.isnan(mean_val) else 0,
-                momentum_val * self.momentum_alloc if not np.isnan(momentum_val) else 0,
-                factor_val * self.factor_alloc if not np.isnan(factor_val) else 0
-            ]
-            total_weight = sum([
-                self.mean_alloc if not np.isnan(mean_val) else 0,
-                self.momentum_alloc if not np.isnan(momentum_val) else 0,
-                self.factor_alloc if not np.isnan(factor_val) else 0
-            ])
-            final_metrics[metric] = sum(weighted_values) / total_weight if total_weight > 0 else np.nan
+        # Final metrics come from the simulated combined equity curve, not from averaging the sleeves' metrics
+        combined = self.simulate(returns_df)[0]
+        self.combined_returns = combined
+        stats = performance_metrics(combined, periods_per_year=252).iloc[0]
+        final_metrics = {metric: stats[metric] for metric in metrics}
 
         return mean_reversion_summary, momentum_summary, factor_summary, final_metrics
+
+    def optimize_allocations(self, method: str = 'mean_variance', returns_df: pd.DataFrame = None) -> pd.Series:
+        """
+        Re-solves the sleeve allocations from the daily sleeve returns (see RiskManagement.optimize_allocation),
+        targeting the risk profile's volatility, and uses them from then on.
+
+        :param returns_df: Daily sleeve returns; defaults to the ones of the last backtest_portfolio.
+        :return: The new allocations, keyed like the returns_df columns.
+        """
+        returns_df = self.combined_results if returns_df is None else returns_df
+        weights = self.risk_manager.optimize_allocation(returns_df, method)
+        self.mean_alloc, self.factor_alloc, self.momentum_alloc = weights['Mean Reversion'], weights['Factor Investing'], weights['Momentum']
+        return self.get_allocations()
+
+    def get_risk_report(self, confidence: float = 0.95, horizon: int = 1, n_paths: int = 100_000, seed: int = None) -> dict:
+        """
+        VaR / CVaR (historical, parametric, Monte Carlo) and stress scenario replays of every sleeve on its
+        own history and of the simulated combined portfolio at the current allocations (see
+        RiskManagement.get_risk_report). Scenarios outside a series' history are replayed from the
+        benchmark through its beta.
+        """
+        self.risk_report = self.risk_manager.get_risk_report(
+            self.sleeve_returns, self.get_allocations().to_dict(), confidence, horizon, n_paths, seed,
+            market_returns=self.benchmark.daily_returns, rebalance=self.rebalance, commission=self.commissions
+        )
+        return self.risk_report
+
+    def get_confidence_intervals(self, n_resamples: int = 1000, block_length: int = 21, confidence: float = 0.95,
+                                 seed: int = None, processes: int = None) -> pd.DataFrame:
+        """
+        Block-bootstrap confidence intervals of CAGR, Sharpe and max drawdown for every sleeve of
+        returns_df and for the combined portfolio (see bootstrap_metrics).
+
+        :param seed: Seed of the resampling, so a report can be reproduced exactly.
+        :return: DataFrame indexed by (Series, Metric) with 'Estimate', 'Lower', 'Upper' and 'Std. Error' columns.
+        """
+        returns = self.combined_results.copy()
+        returns['Portfolio'] = self.simulate()[0]
+        self.confidence_intervals = bootstrap_metrics(
+            returns, n_resamples, block_length, confidence, seed=seed, processes=processes
+        )
+        return self.confidence_intervals
+
+    def get_allocations(self) -> pd.Series:
+        """
+        Sleeve allocations of the risk profile, keyed like the returns_df columns.
+        """
+        return pd.Series({'Mean Reversion': self.mean_alloc, 'Factor Investing': self.factor_alloc, 'Momentum': self.momentum_alloc})
+
+    def simulate(self, returns_df: pd.DataFrame = None, allocations=None) -> pd.DataFrame:
+        """
+        Daily returns of the combined portfolio (see simulate_portfolios), rebalanced to the allocations
+        at self.rebalance with self.commissions charged on the turnover.
+
+        :param returns_df: Daily sleeve returns; defaults to the ones of the last backtest_portfolio.
+        :param allocations: One or many allocation vectors; defaults to the risk profile's.
+        :return: DataFrame of daily returns, dates x allocations.
+        """
+        returns_df = self.combined_results if returns_df is None else returns_df
+        allocations = self.get_allocations() if allocations is None else allocations
+        return simulate_portfolios(returns_df, allocations, self.rebalance, self.commissions)
+
+    def get_efficient_set(self, step: float = 0.02, chunk_size: int = 1000) -> pd.DataFrame:
+        """
+        Simulates every long-only sleeve allocation in increments of `step` over the backtested sleeve
+        returns and flags the efficient ones (highest return for their volatility).
+
+        :param chunk_size: Allocations simulated per matrix pass, to bound memory.
+        :return: DataFrame with the sleeve weights, the performance_metrics columns and an 'Efficient' flag.
+        """
+        grid = allocation_grid(list(self.combined_results.columns), step)
+        metrics = pd.concat([
+            performance_metrics(self.simulate(allocations=grid.iloc[i:i + chunk_size]), periods_per_year=252)
+            for i in range(0, len(grid), chunk_size)
+        ])
+        table = pd.concat([grid, metrics], axis=1)
+        table['Efficient'] = efficient_set(table)
+        self.efficient_set = table
+        return table
+
+    def plot_efficient_set(self, save_path=None, step: float = 0.02):
+        """
+        Volatility / return scatter of every allocation, with the efficient set and the risk profile's allocation.
+        """
+        table = self.get_efficient_set(step)
+        profile = performance_metrics(self.simulate(), periods_per_year=252).iloc[0]
+        frontier = table[table['Efficient']].sort_values('Volatility (Ann.) [%]')
+
+        plt.figure(figsize=(10, 6))
+        plt.scatter(table['Volatility (Ann.) [%]'], table['Return (Ann.) [%]'], c=table['Sharpe Ratio'], cmap='viridis', s=8)
+        plt.colorbar(label='Sharpe Ratio')
+        plt.plot(frontier['Volatility (Ann.) [%]'], frontier['Return (Ann.) [%]'], color='black', linewidth=1.5, label='Efficient set')
+        plt.scatter([profile['Volatility (Ann.) [%]']], [profile['Return (Ann.) [%]']], color='red', marker='*', s=200, label='Risk profile allocation')
+        plt.title('Sleeve Allocations')
+        plt.xlabel('Volatility (Ann.) [%]')
+        plt.ylabel('Return (Ann.) [%]')
+        plt.grid(True)
+        plt.legend()
+        plt.tight_layout()
+
+        if save_path is None:
+            save_path = os.path.join("reporting", "charts", "efficient_set.png")
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        plt.savefig(save_path)
+        plt.close()
+
+        return save_path
     
 
     def returns_df(self, mean_reversion, momentum, factor_investing):
@@ -128,11 +315,11 @@ class Portfolio:
         
         Parameters:
             mean_reversion (dict): Daily returns (only use first).
-            momentum (pd.Series): Monthly returns.
+            momentum (pd.Series): Daily returns.
             factor_investing (pd.Series): Daily returns.
             
         Returns:
-            pd.DataFrame: Combined returns with columns:
+            pd.DataFrame: Combined returns on the trading days all three share, with columns:
                         ['Mean Reversion', 'Factor Investing', 'Momentum']
         """
         
@@ -143,30 +330,15 @@ class Portfolio:
         first_key = next(iter(mean_reversion))
         mean_reversion = pd.Series(mean_reversion[first_key])
 
-        monthly_dates = pd.date_range(start=self.start, periods=len(momentum), freq='ME')
-        momentum.index = monthly_dates        
-        # Create common index
-        start_date = min(
-            #momentum.index.min(), 
-            mean_reversion.index.min(), 
-            factor_investing.index.min()
-        )
-        end_date = max(
-            #momentum.index.max(), 
-            mean_reversion.index.max(), 
-            factor_investing.index.max()
-        )
-        full_index = pd.date_range(start=start_date, end=end_date, freq='D')
-        
-        combined = pd.DataFrame(index=full_index)
-        
-        combined['Mean Reversion'] = mean_reversion
-        combined['Factor Investing'] = factor_investing
-        
-        
-        momentum_daily_value = momentum.reindex(full_index, method='ffill')
-        combined['Momentum'] = momentum_daily_value.pct_change().fillna(0)
+        combined = pd.DataFrame({
+            'Mean Reversion': mean_reversion,
+            'Factor Investing': factor_investing,
+            'Momentum': momentum,
+        })
 
+        # A sleeve that produced no returns at all would otherwise empty every row
+        combined = combined.dropna(axis=1, how='all')
+        self.sleeve_returns = combined.copy()       # every sleeve on its own history, for the risk report
         combined.dropna(how='any', inplace=True)
         self.combined_results = combined
         return combined
@@ -226,17 +398,139 @@ class Portfolio:
         return equity_path, returns_path
 
 
-    def backtest_portfolio(self):
-        mean_reversion_results, mean_returns = self.backtest_mean()
-        momentum_results, momentum_returns = self.backtest_momentum()
-        factor_results, factor_returns = self.backtest_factor()
+    def _timed(self, stage: str, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.stage_timings[stage] = time.perf_counter() - t0
 
-        mean_reversion_summary, momentum_summary, factor_summary, final_metrics = self._get_portfolio_results(mean_reversion_results, momentum_results, factor_results)
-        benchmark_results = self.benchmark.get_metrics()
+    def backtest_portfolio(self, processes: int = None):
+        """
+        Runs the three sleeves and the benchmark concurrently, then aggregates them.
+
+        Each sleeve runs in its own thread, so their loading from the shared market data overlaps;
+        mean reversion's per-ticker backtests, which are pure Python, go to a process pool.
+        Wall time per stage is kept in self.stage_timings.
+
+        :param processes: Process pool size for the mean reversion backtests; defaults to os.cpu_count().
+                          1 runs every sleeve one after another in-process.
+        """
+        self.stage_timings = {}
+        t0 = time.perf_counter()
+        sleeves = {
+            'Mean Reversion': self.backtest_mean,
+            'Momentum': self.backtest_momentum,
+            'Factor Investing': self.backtest_factor,
+            'Benchmark': self.benchmark.get_metrics,
+        }
+
+        if processes == 1:
+            outputs = {stage: self._timed(stage, fn) for stage, fn in sleeves.items()}
+        else:
+            pool = ProcessPoolExecutor(max_workers=processes) if len(self.mean_tickers) > 1 else None
+            try:
+                if pool is not None:
+                    # Fork the workers now, before any sleeve thread exists to hold a lock they would inherit
+                    pool.submit(os.getpid).result()
+                    sleeves['Mean Reversion'] = partial(self.backtest_mean, executor=pool)
+                with ThreadPoolExecutor(max_workers=len(sleeves)) as threads:
+                    futures = {stage: threads.submit(self._timed, stage, fn) for stage, fn in sleeves.items()}
+                    outputs = {stage: future.result() for stage, future in futures.items()}
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+
+        self.stage_timings = {stage: self.stage_timings[stage] for stage in sleeves}
+        (_, mean_returns), (momentum_results, momentum_returns), (factor_results, factor_returns), benchmark_results = outputs.values()
+
+        t1 = time.perf_counter()
         returns_df = self.returns_df(mean_returns, momentum_returns, factor_returns)
+        if self.allocation_method is not None:
+            self.optimize_allocations(self.allocation_method, returns_df)
+        mean_reversion_summary, momentum_summary, factor_summary, final_metrics = self._get_portfolio_results(mean_returns, momentum_results, factor_results, returns_df)
+        self.benchmark_regression = self.get_benchmark_regression(mean_returns, momentum_returns, factor_returns)
+        self.stage_timings['Aggregation'] = time.perf_counter() - t1
+        self.stage_timings['Total'] = time.perf_counter() - t0
+
+        breakdown = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in self.stage_timings.items() if stage != 'Total')
+        print(f"✅ Portfolio backtest finished in {self.stage_timings['Total']:.1f}s ({breakdown})")
         return mean_reversion_summary, momentum_summary, factor_summary, final_metrics, benchmark_results, returns_df
 
 
+    def get_benchmark_regression(self, mean_returns: dict, momentum_returns: pd.Series, factor_returns: pd.Series) -> pd.DataFrame:
+        """
+        Alpha, beta, R², tracking error and information ratio against the benchmark for every
+        mean reversion ticker and every strategy, regressed together on daily returns in one batch.
+
+        :return: DataFrame with one row per series ('Mean Reversion: <ticker>', 'Momentum', 'Factor Investing').
+        """
+        daily = pd.DataFrame({f'Mean Reversion: {ticker}': rets for ticker, rets in mean_returns.items()})
+        daily['Momentum'] = momentum_returns
+        daily['Factor Investing'] = factor_returns
+        return regression_metrics(daily, self.benchmark.daily_returns, periods_per_year=252)
+
+    def walk_forward(self, train_months: int = 24, test_months: int = 6, param_grid: dict = None, processes: int = None):
+        """
+        Walk-forward evaluation: rolls train/test folds over [start, end], runs every strategy
+        per fold in a process pool and stitches the out-of-sample returns.
+
+        Prices are loaded once up front and shared with the fold workers. Factor picks are screened
+        in the parent on the fundamentals snapshot known at each test start.
+
+        :param param_grid: Optional mean reversion grid tuned on each train window (see GenericBacktestEngine.optimize).
+        :param processes: Pool size; defaults to os.cpu_count(). 1 runs in-process.
+        :return: (DataFrame of stitched out-of-sample daily simple returns per strategy, DataFrame describing each fold).
+        """
+        folds = walk_forward_folds(self.start, self.end, train_months, test_months)
+        if not folds:
+            raise ValueError("Window too short for a single walk-forward fold.")
+
+        t0 = time.perf_counter()
+        picks = {test_start: self.factor_strategy.get_stocks(test_start) for _, test_start, _ in folds}
+        factor_tickers = sorted({t for tickers in picks.values() for t in tickers})
+        shared = {
+            'ohlcv': self.market.get_multiple_data(self.mean_tickers, self.start, self.end),
+            'momentum_panel': self.momentum_strategy._get_panel(),
+            'index_returns': self.momentum_strategy._get_index_returns(),
+            'factor_prices': self.market.get_close_panel(factor_tickers, self.start, self.end),
+        }
+        print(f"Walk-forward data loaded in {time.perf_counter() - t0:.1f}s")
+
+        tasks = [
+            {
+                'fold': i, 'train_start': train_start, 'test_start': test_start, 'test_end': test_end,
+                'last': i == len(folds) - 1, 'factor_tickers': picks[test_start], 'param_grid': param_grid,
+                'mean_cash': self.mean_alloc * self.cash, 'momentum_equity': self.momentum_alloc,
+                'commissions': self.commissions
+            }
+            for i, (train_start, test_start, test_end) in enumerate(folds)
+        ]
+        if processes == 1:
+            outputs = [_run_fold(task, shared) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_fold_worker, initargs=(shared,)) as pool:
+                outputs = list(pool.map(_run_fold, tasks))
+
+        strategies = ['Mean Reversion', 'Momentum', 'Factor Investing']
+        oos_returns = pd.DataFrame({
+            strat: pd.concat([out['returns'][strat] for out in outputs if strat in out['returns']] or [pd.Series(dtype=float)]).sort_index()
+            for strat in strategies
+        })
+        fold_table = pd.DataFrame([
+            {
+                'Train Start': task['train_start'], 'Test Start': task['test_start'], 'Test End': task['test_end'],
+                'Mean Reversion Params': out['params'], 'Factor Picks': task['factor_tickers'],
+                **{f'{strat} Return [%]': ((1 + out['returns'][strat]).prod() - 1) * 100 if strat in out['returns'] else np.nan for strat in strategies}
+            }
+            for task, out in zip(tasks, outputs)
+        ])
+
+        self.walk_forward_returns = oos_returns
+        self.walk_forward_folds = fold_table
+        print(f"✅ Walk-forward over {len(folds)} folds finished in {time.perf_counter() - t0:.1f}s")
+        return oos_returns, fold_table
+
     def plot_stratgies(self):
         factor_plot_path = self.factor_strategy.plot_performance()
         momentum_plot_path = self.momentum_strategy.plot_preformance()
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+
+METRICS = [
+    'Return [%]', 'Return (Ann.) [%]', 'CAGR [%]', 'Volatility (Ann.) [%]', 'Sharpe Ratio', 'Sortino Ratio',
+    'Calmar Ratio', 'Alpha [%]', 'Beta', 'R²', 'Tracking Error (Ann.) [%]', 'Information Ratio',
+    'Max. Drawdown [%]', 'Avg. Drawdown [%]', 'Max. Drawdown Duration', 'Avg. Drawdown Duration'
+]
+
+REGRESSION_METRICS = ['Alpha [%]', 'Beta', 'R²', 'Tracking Error (Ann.) [%]', 'Information Ratio']
+
+
+def drawdown_episodes(drawdown: np.ndarray):
+    """
+    Locates every underwater episode of every column at once.
+
+    :param drawdown: T x N array of drawdowns (<= 0).
+    :return: (column, start, end) arrays: an episode of `column` is underwater from row `start`
+             up to, not including, row `end` (end == T when it has not recovered).
+    """
+    underwater = np.zeros((drawdown.shape[0] + 2, drawdown.shape[1]), dtype=np.int8)
+    underwater[1:-1] = drawdown < 0
+    edges = np.diff(underwater, axis=0).T       # N x (T+1), ordered by column then row
+    column, start = np.nonzero(edges == 1)
+    _, end = np.nonzero(edges == -1)
+    return column, start, end
+
+
+def _regression_sums(returns, market_returns: pd.Series):
+    """
+    Per-row terms of the least squares of every column on the market, zeroed where either side is missing.
+    """
+    frame = returns.to_frame() if isinstance(returns, pd.Series) else returns
+    y = frame.to_numpy(dtype=float)
+    x = market_returns.reindex(frame.index).to_numpy(dtype=float)[:, None]
+    both = ~np.isnan(y) & ~np.isnan(x)
+    x, y = np.where(both, x, 0.0), np.where(both, y, 0.0)
+    return frame, np.stack([both.astype(float), x, y, x * x, y * y, x * y])
+
+
+def _regression_from_sums(sums: np.ndarray, periods_per_year: int) -> dict:
+    """
+    Alpha, beta, R², tracking error and information ratio from the sums of (1, x, y, x², y², xy).
+    """
+    n, sx, sy, sxx, syy, sxy = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        beta = cov / var_x
+        alpha = (sy - beta * sx) / n * periods_per_year
+
+        # Active return d = y - x, with its sums derived from the same terms
+        sd = sy - sx
+        var_d = (syy - 2 * sxy + sxx) - sd * sd / n
+        tracking_error = np.sqrt(var_d / (n - 1) * periods_per_year)
+        return {
+            'Alpha [%]': alpha * 100,
+            'Beta': beta,
+            'R²': cov * cov / (var_x * var_y),
+            'Tracking Error (Ann.) [%]': tracking_error * 100,
+            'Information Ratio': sd / n * periods_per_year / tracking_error,
+        }
+
+
+def regression_metrics(returns, market_returns: pd.Series, periods_per_year: int = 252) -> pd.DataFrame:
+    """
+    Regresses every return series on the market in one batched least squares over the aligned matrix.
+
+    Alpha is the annualized intercept; tracking error and information ratio use the active return
+    (series minus market). Periods where either side is missing are left out per series.
+
+    :param returns: Periodic simple returns, a Series or a DataFrame with one column per series.
+    :param market_returns: Periodic simple returns of the market (e.g. ^GSPC) on the same frequency.
+    :return: DataFrame with one row per series and REGRESSION_METRICS as columns.
+    """
+    frame, terms = _regression_sums(returns, market_returns)
+    return pd.DataFrame(_regression_from_sums(terms.sum(axis=1), periods_per_year), index=frame.columns)
+
+
+def rolling_regression_metrics(returns, market_returns: pd.Series, window: int, periods_per_year: int = 252) -> dict:
+    """
+    Rolling-window version of regression_metrics: window sums are differences of cumulative sums,
+    so every window of every series comes out of one pass.
+
+    :param window: Number of periods per window; windows with a missing period are NaN.
+    :return: Dict of metric: DataFrame (dates x series).
+    """
+    frame, terms = _regression_sums(returns, market_returns)
+    cumulative = np.cumsum(np.concatenate([np.zeros_like(terms[:, :1]), terms], axis=1), axis=1)
+    sums = np.full_like(terms, np.nan)
+    sums[:, window - 1:] = cumulative[:, window:] - cumulative[:, :-window]
+    full = sums[0] == window
+    rolling = _regression_from_sums(sums, periods_per_year)
+    return {metric: pd.DataFrame(np.where(full, values, np.nan), index=frame.index, columns=frame.columns) for metric, values in rolling.items()}
+
+
+def performance_metrics(returns, periods_per_year: int = 252, risk_free_rate: float = 0.0, benchmark_returns: pd.Series = None) -> pd.DataFrame:
+    """
+    Performance metrics of many return series in a single vectorized pass.
+
+    Annualized return is the geometric mean per period compounded over periods_per_year (equal to CAGR);
+    Sharpe and Sortino divide its excess over the risk-free rate by the annualized volatility and downside
+    deviation; drawdown durations run from the last peak to the recovery (or the last bar). Alpha, beta
+    and the other regression_metrics are filled in when benchmark_returns is given.
+
+    :param returns: Periodic simple returns, a Series or a DataFrame with one column per series. NaN rows are skipped.
+    :param periods_per_year: 252 for daily returns, 12 for monthly.
+    :param risk_free_rate: Annual risk-free rate as a fraction.
+    :param benchmark_returns: Optional periodic returns of the market for alpha and beta.
+    :return: DataFrame with one row per series and METRICS as columns.
+    """
+    frame = returns.to_frame() if isinstance(returns, pd.Series) else returns
+    r = frame.to_numpy(dtype=float)
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=0)
+    r0 = np.where(valid, r, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        wealth = np.cumprod(1 + r0, axis=0)
+        total = wealth[-1] - 1 if len(r) else np.full(r.shape[1], np.nan)
+        ann_return = (1 + total) ** (periods_per_year / n) - 1
+        mean = r0.sum(axis=0) / n
+        volatility = np.sqrt((np.where(valid, r0 - mean, 0.0) ** 2).sum(axis=0) / (n - 1) * periods_per_year)
+        downside = np.sqrt((np.minimum(r0, 0) ** 2).sum(axis=0) / n * periods_per_year)
+        sharpe = (ann_return - risk_free_rate) / volatility
+        sortino = (ann_return - risk_free_rate) / downside
+
+        # Drawdowns against the running peak, starting from the initial equity
+        peak = np.maximum.accumulate(np.vstack([np.ones((1, r.shape[1])), wealth]), axis=0)[1:]
+        drawdown = wealth / peak - 1
+        max_dd = drawdown.min(axis=0, initial=0.0)
+        calmar = np.where(max_dd < 0, ann_return / np.abs(max_dd), np.nan)
+
+        regression = dict.fromkeys(REGRESSION_METRICS, np.full(r.shape[1], np.nan))
+        if benchmark_returns is not None:
+            regression = {k: v.to_numpy() for k, v in regression_metrics(frame, benchmark_returns, periods_per_year).items()}
+
+    # Per-episode depth and duration, aggregated per column without a bar loop
+    ncols = r.shape[1]
+    column, start, end = drawdown_episodes(drawdown)
+    episodes = np.bincount(column, minlength=ncols)
+    flat = drawdown.T.ravel()
+    depth = np.minimum.reduceat(flat, column * len(r) + start) if len(start) else np.array([])
+    avg_dd = np.divide(np.bincount(column, weights=depth, minlength=ncols), episodes, out=np.zeros(ncols), where=episodes > 0)
+
+    index = frame.index
+    is_datetime = isinstance(index, pd.DatetimeIndex)
+    positions = index.asi8 if is_datetime else np.arange(len(index))
+    spans = (positions[np.minimum(end, len(r) - 1)] - positions[np.maximum(start - 1, 0)]).astype(float)
+    max_span = np.zeros(ncols)
+    np.maximum.at(max_span, column, spans)
+    avg_span = np.divide(np.bincount(column, weights=spans, minlength=ncols), episodes, out=np.zeros(ncols), where=episodes > 0)
+    if is_datetime:
+        max_span, avg_span = pd.to_timedelta(max_span.round(), unit='ns'), pd.to_timedelta(avg_span.round(), unit='ns')
+
+    return pd.DataFrame({
+        'Return [%]': total * 100,
+        'Return (Ann.) [%]': ann_return * 100,
+        'CAGR [%]': ann_return * 100,
+        'Volatility (Ann.) [%]': volatility * 100,
+        'Sharpe Ratio': sharpe,
+        'Sortino Ratio': sortino,
+        'Calmar Ratio': calmar,
+        **regression,
+        'Max. Drawdown [%]': max_dd * 100,
+        'Avg. Drawdown [%]': avg_dd * 100,
+        'Max. Drawdown Duration': max_span,
+        'Avg. Drawdown Duration': avg_span,
+    }, index=frame.columns)
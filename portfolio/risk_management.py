@@ -1,3 +1,13 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from portfolio.risk_measures import historical_var, monte_carlo_var, parametric_var, stress_test
+from portfolio.simulation import allocation_grid, simulate_portfolios
+
+
 class RiskManagement:
     """A class to manage risk allocations and strategy distribution based on user's profile."""
     
@@ -16,6 +26,12 @@ class RiskManagement:
     
     MAX_RISK_SCORE = TOLERANCE_MAPPING['high'] * TIME_MAPPING['short']
 
+    # Annualized volatility targeted by the optimizer at risk scores 0 and 1
+    MIN_TARGET_VOL = 0.05
+    MAX_TARGET_VOL = 0.25
+
+    OPTIMIZER_METHODS = ('mean_variance', 'risk_parity', 'min_cvar')
+
     def __init__(self, user_tolerance: str, user_time: str):
         """Initialize with user's risk tolerance and time horizon.
         
@@ -29,6 +45,7 @@ class RiskManagement:
         # Validate inputs
         self._validate_inputs()
         self._risk_score = self._get_risk_score()  # Calculate risk score at initialization
+        self._estimates = {}  # returns fingerprint -> (annualized mean, annualized covariance, return matrix)
 
     def _validate_inputs(self):
         """Validate that inputs are within expected values."""
@@ -71,6 +88,143 @@ class RiskManagement:
             'factor_investing': factor_inv / total
         }
 
+    def target_volatility(self) -> float:
+        """Annualized volatility matching the risk score, linear between MIN_TARGET_VOL and MAX_TARGET_VOL.
+
+        Returns:
+            float: Target volatility as a fraction
+        """
+        return self.MIN_TARGET_VOL + self._risk_score * (self.MAX_TARGET_VOL - self.MIN_TARGET_VOL)
+
+    def _get_estimates(self, returns: pd.DataFrame, periods_per_year: int) -> tuple:
+        """Annualized mean and covariance of the sleeve returns, cached by a fingerprint of the data.
+
+        Args:
+            returns: Periodic sleeve returns, one column per sleeve
+            periods_per_year: 252 for daily returns
+
+        Returns:
+            tuple: (mean vector, covariance matrix, return matrix without NaN rows)
+        """
+        values = returns.dropna().to_numpy(dtype=float)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.ascontiguousarray(values).tobytes())
+        h.update(repr((list(returns.columns), periods_per_year)).encode())
+        key = h.hexdigest()
+
+        if key not in self._estimates:
+            mean = values.mean(axis=0) * periods_per_year
+            cov = np.atleast_2d(np.cov(values, rowvar=False)) * periods_per_year
+            self._estimates[key] = (mean, cov, values)
+        return self._estimates[key]
+
+    @staticmethod
+    def _risk_parity(cov: np.ndarray, tol: float = 1e-10, max_iter: int = 1000) -> np.ndarray:
+        """Long-only weights whose risk contributions w_i * (cov w)_i are all equal (fixed-point iteration)."""
+        w = 1 / np.sqrt(np.diag(cov))
+        w /= w.sum()
+        for _ in range(max_iter):
+            contributions = w * (cov @ w)
+            updated = w * np.sqrt(contributions.mean() / contributions)
+            updated /= updated.sum()
+            if np.abs(updated - w).max() < tol:
+                return updated
+            w = updated
+        return w
+
+    def optimize_allocation(self, returns: pd.DataFrame, method: str = 'mean_variance', periods_per_year: int = 252,
+                            step: float = 0.01, confidence: float = 0.95) -> dict:
+        """Solves for long-only, fully invested sleeve allocations from the sleeve return matrix.
+
+        The risk score sets the target volatility (see target_volatility):
+            - mean_variance: highest expected return whose volatility stays within the target
+            - min_cvar: highest expected return whose historical CVaR stays within the CVaR of a normal
+              distribution with the target volatility; the lowest-CVaR allocation if none does
+            - risk_parity: equal risk contributions (independent of the target)
+        mean_variance and min_cvar score every allocation of a `step` grid in one vectorized pass and
+        fall back to the lowest-risk allocation when the target cannot be met. Mean and covariance
+        are cached per return matrix, so re-optimizing the same data is nearly free.
+
+        Args:
+            returns: Periodic sleeve returns, one column per sleeve
+            method: One of OPTIMIZER_METHODS
+            periods_per_year: 252 for daily returns
+            step: Weight increment of the allocation grid
+            confidence: CVaR confidence level for min_cvar
+
+        Returns:
+            dict: {sleeve: weight} keyed by the return columns
+        """
+        if method not in self.OPTIMIZER_METHODS:
+            raise ValueError(f"Invalid optimizer method. Expected one of: {list(self.OPTIMIZER_METHODS)}")
+
+        mean, cov, values = self._get_estimates(returns, periods_per_year)
+        if method == 'risk_parity':
+            return dict(zip(returns.columns, self._risk_parity(cov).tolist()))
+
+        grid = allocation_grid(list(returns.columns), step).to_numpy()
+        expected = grid @ mean
+        target = self.target_volatility()
+
+        if method == 'mean_variance':
+            risk = np.sqrt(np.einsum('ki,ij,kj->k', grid, cov, grid))
+            budget = target
+        else:
+            # Historical CVaR of every allocation: mean loss over the worst (1 - confidence) periods
+            losses = -(values @ grid.T)
+            tail = max(int(np.ceil(len(values) * (1 - confidence))), 1)
+            risk = np.partition(losses, len(values) - tail, axis=0)[-tail:].mean(axis=0)
+            z = norm.ppf(confidence)
+            budget = target / np.sqrt(periods_per_year) * norm.pdf(z) / (1 - confidence)
+
+        feasible = risk <= budget
+        best = np.argmax(np.where(feasible, expected, -np.inf)) if feasible.any() else np.argmin(risk)
+        return dict(zip(returns.columns, grid[best].tolist()))
+
+    def get_risk_report(self, returns: pd.DataFrame, allocations: dict, confidence: float = 0.95, horizon: int = 1,
+                        n_paths: int = 100_000, seed: int = None, market_returns: pd.Series = None,
+                        rebalance: str = 'ME', commission: float = 0.0) -> dict:
+        """Measures the risk of every sleeve and of the combined portfolio.
+
+        Each sleeve is measured and replayed on its own history. The portfolio is the combined
+        portfolio simulated over the days every sleeve has a return (see simulate_portfolios), so it
+        drifts between rebalances and pays commission on the turnover. The Monte Carlo paths draw the
+        sleeves jointly over those days and hold the allocations over the horizon. Stress windows are
+        replayed on the sleeves and the portfolio (see stress_test).
+
+        Args:
+            returns: Daily sleeve returns, one column per sleeve; NaN outside a sleeve's history
+            allocations: {sleeve: weight} of the combined portfolio
+            confidence: VaR / CVaR confidence level
+            horizon: Horizon in days of the VaR / CVaR
+            n_paths: Number of Monte Carlo paths
+            seed: Seed of the Monte Carlo generator, for reproducible reports
+            market_returns: Optional daily market returns for beta-implied scenario replays
+            rebalance: Pandas offset alias of the portfolio's rebalance schedule
+            commission: Fraction of the traded value charged on the rebalance turnover
+
+        Returns:
+            dict: {
+                'var': DataFrame indexed by (Method, Series) with 'VaR [%]' and 'CVaR [%]' columns,
+                'stress': DataFrame of scenario replays
+            }
+        """
+        weights = pd.Series(allocations, dtype=float).reindex(returns.columns).fillna(0.0)
+        weights /= weights.sum()
+        shared = returns.dropna()
+        series = returns.copy()
+        series['Portfolio'] = simulate_portfolios(shared, weights, rebalance, commission).iloc[:, 0]
+
+        sleeves = pd.DataFrame(np.eye(len(weights)), index=returns.columns, columns=returns.columns)
+        sleeves.loc['Portfolio'] = weights
+        var = pd.concat({
+            'Historical': historical_var(series, confidence, horizon),
+            'Parametric': parametric_var(series, confidence, horizon),
+            'Monte Carlo': monte_carlo_var(shared, sleeves, confidence, horizon, n_paths, seed=seed),
+        }, names=['Method', 'Series'])
+
+        return {'var': var, 'stress': stress_test(series, market_returns=market_returns)}
+
     def get_risk_profile(self) -> dict:
         """Return comprehensive risk profile including score and allocations.
         
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from portfolio.metrics import regression_metrics
+
+
+RISK_MEASURES = ['VaR [%]', 'CVaR [%]']
+
+# Scenario name -> (first day, last day) of a historical market stress window
+STRESS_SCENARIOS = {
+    'COVID crash (Feb-Mar 2020)': ('2020-02-19', '2020-03-23'),
+    'COVID rebound (Mar-Jun 2020)': ('2020-03-24', '2020-06-08'),
+    '2022 rate shock (Jan-Oct 2022)': ('2022-01-03', '2022-10-12'),
+    'SVB banking stress (Mar 2023)': ('2023-03-08', '2023-03-13'),
+    'Yen carry unwind (Jul-Aug 2024)': ('2024-07-16', '2024-08-05'),
+}
+
+
+def _frame(returns) -> pd.DataFrame:
+    return returns.to_frame() if isinstance(returns, pd.Series) else returns
+
+
+def horizon_returns(returns, horizon: int = 1) -> pd.DataFrame:
+    """
+    Overlapping compounded returns over `horizon` periods, for every column at once.
+    Windows with a missing period are NaN.
+    """
+    frame = _frame(returns)
+    if horizon == 1:
+        return frame
+    logs = np.log1p(frame.fillna(0.0).to_numpy(dtype=float))
+    log_wealth = np.vstack([np.zeros((1, logs.shape[1])), np.cumsum(logs, axis=0)])
+    missing = np.vstack([np.zeros((1, logs.shape[1])), np.cumsum(frame.isna().to_numpy(), axis=0)])
+    compounded = np.expm1(log_wealth[horizon:] - log_wealth[:-horizon])
+    compounded[(missing[horizon:] - missing[:-horizon]) > 0] = np.nan
+    return pd.DataFrame(compounded, index=frame.index[horizon - 1:], columns=frame.columns)
+
+
+def historical_var(returns, confidence: float = 0.95, horizon: int = 1) -> pd.DataFrame:
+    """
+    Historical VaR and CVaR of every column: the loss quantile of the observed (horizon-period) returns
+    and the mean loss beyond it.
+
+    :param returns: Periodic simple returns, a Series or a DataFrame with one column per series.
+    :param confidence: Confidence level, e.g. 0.95 or 0.99.
+    :return: DataFrame with one row per series and RISK_MEASURES as columns (losses as positive percentages).
+    """
+    frame = horizon_returns(returns, horizon)
+    r = frame.to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        cutoff = np.nanquantile(r, 1 - confidence, axis=0)
+        tail = np.where(r <= cutoff, r, np.nan)
+        cvar = np.nanmean(tail, axis=0)
+    return pd.DataFrame({'VaR [%]': -cutoff * 100, 'CVaR [%]': -cvar * 100}, index=frame.columns)
+
+
+def parametric_var(returns, confidence: float = 0.95, horizon: int = 1) -> pd.DataFrame:
+    """
+    Gaussian VaR and CVaR of every column from its mean and standard deviation, scaled to `horizon` periods.
+    """
+    frame = _frame(returns)
+    mean = frame.mean().to_numpy() * horizon
+    std = frame.std().to_numpy() * np.sqrt(horizon)
+    z = norm.ppf(1 - confidence)
+    var = -(mean + z * std)
+    cvar = -(mean - std * norm.pdf(z) / (1 - confidence))
+    return pd.DataFrame({'VaR [%]': var * 100, 'CVaR [%]': cvar * 100}, index=frame.columns)
+
+
+def monte_carlo_var(returns, weights=None, confidence: float = 0.95, horizon: int = 1, n_paths: int = 100_000,
+                    chunk_size: int = 10_000, seed: int = None) -> pd.DataFrame:
+    """
+    Monte Carlo VaR and CVaR: paths of the columns are drawn jointly from a multivariate normal fitted to
+    their returns, compounded over `horizon` periods and combined with each weight vector.
+
+    Paths are generated chunk_size at a time and only their final portfolio returns are kept, so memory
+    stays near chunk_size x horizon x columns floats however many paths are run.
+
+    :param weights: Optional weight vectors (dict / Series for one, array or DataFrame with the columns as
+                    columns for many) held over the horizon. Defaults to every column on its own.
+    :param n_paths: Number of simulated paths.
+    :param seed: Seed of the random generator, for reproducible results.
+    :return: DataFrame with one row per weight vector (or column) and RISK_MEASURES as columns.
+    """
+    frame = _frame(returns).dropna()
+    if weights is None:
+        weights = pd.DataFrame(np.eye(frame.shape[1]), index=frame.columns, columns=frame.columns)
+    elif isinstance(weights, (dict, pd.Series)):
+        weights = pd.DataFrame([weights], index=['Portfolio'])
+    elif not isinstance(weights, pd.DataFrame):
+        weights = pd.DataFrame(np.atleast_2d(weights), columns=frame.columns)
+    w = weights.reindex(columns=frame.columns).fillna(0.0).to_numpy(dtype=float)
+
+    mean = frame.mean().to_numpy()
+    chol = np.linalg.cholesky(np.atleast_2d(frame.cov().to_numpy()) + 1e-12 * np.eye(frame.shape[1]))
+    rng = np.random.default_rng(seed)
+
+    outcomes = np.empty((n_paths, len(w)))
+    for start in range(0, n_paths, chunk_size):
+        n = min(chunk_size, n_paths - start)
+        shocks = rng.standard_normal((n, horizon, frame.shape[1])) @ chol.T + mean
+        growth = np.prod(1 + shocks, axis=1)
+        outcomes[start:start + n] = growth @ w.T - w.sum(axis=1)
+
+    cutoff = np.quantile(outcomes, 1 - confidence, axis=0)
+    cvar = np.where(outcomes <= cutoff, outcomes, 0.0).sum(axis=0) / np.maximum((outcomes <= cutoff).sum(axis=0), 1)
+    return pd.DataFrame({'VaR [%]': -cutoff * 100, 'CVaR [%]': -cvar * 100}, index=weights.index)
+
+
+def stress_test(returns, scenarios: dict = None, market_returns: pd.Series = None) -> pd.DataFrame:
+    """
+    Replays historical stress windows on every column.
+
+    Windows a column's own history covers (from its first to its last non-NaN return) use the realized
+    path: the compounded return comes from one pass of cumulative log returns for all scenarios and
+    columns, the drawdown from each window's running peak. Windows a column does not cover are
+    replayed from market_returns instead, scaled by that column's beta to the market over its history.
+
+    :param returns: Daily simple returns; columns may start and end on different dates (NaN outside their history).
+    :param scenarios: Dict of name: (start, end); defaults to STRESS_SCENARIOS.
+    :param market_returns: Optional daily market returns (e.g. ^GSPC) for beta-implied replays.
+    :return: DataFrame indexed by (Scenario, Series) with 'Start', 'End', 'Return [%]', 'Max. Drawdown [%]' and 'Replay'.
+    """
+    frame = _frame(returns)
+    scenarios = STRESS_SCENARIOS if scenarios is None else scenarios
+    index = frame.index
+    valid = frame.notna().to_numpy()
+    r = frame.fillna(0.0).to_numpy(dtype=float)
+    log_wealth = np.vstack([np.zeros((1, r.shape[1])), np.cumsum(np.log1p(r), axis=0)])
+
+    # First and last dates of every column's own history
+    has_data = valid.any(axis=0)
+    first_valid = index[np.where(has_data, valid.argmax(axis=0), 0)] if len(index) else index
+    last_valid = index[np.where(has_data, len(index) - 1 - valid[::-1].argmax(axis=0), 0)] if len(index) else index
+
+    beta = None
+    if market_returns is not None:
+        beta = regression_metrics(frame, market_returns)['Beta'].to_numpy()
+        market_returns = market_returns.dropna()
+
+    rows = []
+    nan = np.full(r.shape[1], np.nan)
+    for name, (start, end) in scenarios.items():
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        first, last = index.searchsorted(start), index.searchsorted(end, side='right')
+        covered = has_data & (first_valid <= start) & (last_valid >= end) & (last > first)
+
+        total, drawdown = nan.copy(), nan.copy()
+        if covered.any():
+            window = log_wealth[first:last + 1]
+            total = np.where(covered, np.expm1(window[-1] - window[0]), total)
+            drawdown = np.where(covered, np.exp(window - np.maximum.accumulate(window, axis=0)).min(axis=0) - 1, drawdown)
+
+        implied = np.zeros(r.shape[1], dtype=bool)
+        if beta is not None and ((market_returns.index >= start) & (market_returns.index <= end)).any():
+            implied = ~covered & ~np.isnan(beta)
+            market = market_returns[(market_returns.index >= start) & (market_returns.index <= end)].to_numpy()
+            path = np.vstack([np.zeros((1, r.shape[1])), np.cumsum(np.log1p(np.outer(market, beta)), axis=0)])
+            total = np.where(implied, np.expm1(path[-1]), total)
+            drawdown = np.where(implied, np.exp(path - np.maximum.accumulate(path, axis=0)).min(axis=0) - 1, drawdown)
+
+        replay = np.where(covered, 'historical', np.where(implied, 'beta-implied', 'no data'))
+        for column, ret, dd, how in zip(frame.columns, total, drawdown, replay):
+            rows.append({'Scenario': name, 'Series': column, 'Start': start, 'End': end,
+                         'Return [%]': ret * 100, 'Max. Drawdown [%]': dd * 100, 'Replay': how})
+
+    return pd.DataFrame(rows).set_index(['Scenario', 'Series'])
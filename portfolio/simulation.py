@@ -0,0 +1,95 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+def rebalance_periods(index: pd.DatetimeIndex, rebalance: str = 'ME') -> np.ndarray:
+    """
+    Rebalance period of every date: periods start on the first date of each `rebalance` bucket.
+
+    :param rebalance: Pandas offset alias ('D', 'W', 'ME', 'QE', 'YE'). None holds one period (buy and hold).
+    :return: Integer period id per date, starting at 0.
+    """
+    if rebalance is None or len(index) == 0:
+        return np.zeros(len(index), dtype=int)
+    starts = index.to_series().resample(rebalance).first().dropna().to_numpy()
+    return np.searchsorted(starts, index.to_numpy(), side='right') - 1
+
+
+def simulate_portfolios(returns: pd.DataFrame, allocations, rebalance: str = 'ME', commission: float = 0.0) -> pd.DataFrame:
+    """
+    Daily returns of combined portfolios of the sleeves, for many allocation vectors at once.
+
+    Every portfolio is set to its target weights at the start of each rebalance period and then
+    drifts with its sleeves. Its value is the sleeves' growth since the period start times the
+    weights, so all allocations come out of one (dates x sleeves) @ (sleeves x allocations) product.
+
+    :param returns: Daily simple returns, one column per sleeve; NaN counts as a flat day.
+    :param allocations: Target weights, one vector per portfolio: a dict / Series for one, an array
+                        (portfolios x sleeves) or a DataFrame with the sleeves as columns for many.
+                        Each vector is normalized to sum to 1.
+    :param rebalance: Pandas offset alias of the rebalance schedule; None lets the weights drift for good.
+    :param commission: Fraction of the traded value charged on the turnover at every rebalance.
+    :return: DataFrame of daily returns, dates x portfolios (named after the allocation index, if any).
+    """
+    frame = returns.fillna(0.0)
+    if isinstance(allocations, (dict, pd.Series)):
+        allocations = pd.DataFrame([allocations])
+    if isinstance(allocations, pd.DataFrame):
+        labels = allocations.index
+        weights = allocations.reindex(columns=frame.columns).fillna(0.0).to_numpy(dtype=float)
+    else:
+        weights = np.atleast_2d(np.asarray(allocations, dtype=float))
+        labels = pd.RangeIndex(len(weights))
+    weights = weights / weights.sum(axis=1, keepdims=True)
+
+    period = rebalance_periods(frame.index, rebalance)
+    first = np.r_[True, period[1:] != period[:-1]]
+
+    # Growth of each sleeve since its period start, at the close and at the previous close
+    growth = (1 + frame).groupby(period).cumprod().to_numpy()
+    before = np.vstack([np.ones((1, growth.shape[1])), growth[:-1]])
+    before[first] = 1.0
+
+    value = growth @ weights.T
+    prev_value = before @ weights.T
+    out = np.divide(value, prev_value, out=np.ones_like(value), where=prev_value > 0) - 1
+
+    if commission:
+        # Turnover from the weights drifted over the previous period back to the targets
+        rebalances = np.flatnonzero(first)[1:]
+        drifted = weights[None, :, :] * growth[rebalances - 1][:, None, :]
+        drifted /= drifted.sum(axis=2, keepdims=True)
+        turnover = np.abs(weights[None, :, :] - drifted).sum(axis=2)
+        out[rebalances] = (1 + out[rebalances]) * (1 - commission * turnover) - 1
+
+    return pd.DataFrame(out, index=frame.index, columns=labels)
+
+
+def allocation_grid(sleeves: list, step: float = 0.05) -> pd.DataFrame:
+    """
+    Every long-only allocation of the sleeves in increments of `step` (weights sum to 1).
+
+    :return: DataFrame with one row per allocation and the sleeves as columns.
+    """
+    units = int(round(1 / step))
+    n = len(sleeves)
+    # Stars and bars: each choice of n-1 dividers among units+n-1 slots is one allocation
+    bars = np.array(list(itertools.combinations(range(units + n - 1), n - 1)), dtype=int).reshape(-1, n - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), units + n - 1)])
+    return pd.DataFrame(np.diff(edges, axis=1) - 1, columns=sleeves) / units
+
+
+def efficient_set(metrics: pd.DataFrame, risk: str = 'Volatility (Ann.) [%]', reward: str = 'Return (Ann.) [%]') -> pd.Series:
+    """
+    Flags the allocations no other allocation beats on reward without taking more risk.
+
+    :return: Boolean Series aligned with metrics.
+    """
+    r, x = metrics[risk].to_numpy(dtype=float), metrics[reward].to_numpy(dtype=float)
+    order = np.lexsort((-x, r))
+    best_before = np.r_[-np.inf, np.maximum.accumulate(x[order])[:-1]]
+    efficient = np.zeros(len(metrics), dtype=bool)
+    efficient[order] = x[order] > best_before
+    return pd.Series(efficient, index=metrics.index)
@@ -8,7 +8,7 @@ from bs4 import BeautifulSoup
 import imgkit
 import os
 
-def _render_html(start_date, end_date,risk, time, mean_tickers, factor_tickers, commissions, cash):
+def _render_html(start_date, end_date,risk, time, mean_tickers, factor_tickers, commissions, cash, market=None):
 
     template_env = jinja2.Environment(
         loader=jinja2.FileSystemLoader(os.path.join(os.path.dirname(__file__), "templates")),
@@ -26,7 +26,7 @@ def _render_html(start_date, end_date,risk, time, mean_tickers, factor_tickers,
     output_filename = f"ASG Microfund - {start_date} to {end_date}.html"
     output_path = os.path.join(output_dir, output_filename)
 
-    port = Portfolio('2020-01-01', '2025-01-01', commissions, cash, mean_tickers, factor_tickers, risk,  time)
+    port = Portfolio('2020-01-01', '2025-01-01', commissions, cash, mean_tickers, factor_tickers, risk,  time, market=market)
     mean_reversion_summary, momentum_summary, factor_summary, final_metrics, benchmark_summary, returns_df= port.backtest_portfolio()
     factor_plot_dir, mom_plot_dir, mean_plot_dir, equity_curve_path, daily_return_path = port.plot_stratgies()
 
@@ -58,7 +58,7 @@ def _render_html(start_date, end_date,risk, time, mean_tickers, factor_tickers,
     )
     return rendered_html, output_path
 
-def generate_report(start_date, end_date, risk, time, mean_tickers, factor_tickers, commissions, cash):
+def generate_report(start_date, end_date, risk, time, mean_tickers, factor_tickers, commissions, cash, market=None):
     """
     Generates an HTML performance report for a strategy over a given time range.
     
@@ -66,11 +66,12 @@ def generate_report(start_date, end_date, risk, time, mean_tickers, factor_ticke
         strategy (object): The strategy instance.
         start_date (str): Start date in 'YYYY-MM-DD' format.
         end_date (str): End date in 'YYYY-MM-DD' format.
+        market (market_data): Optional shared market data context, so the run loads each series once.
     """
 
     # Set up the Jinja2 environment
     
-    rendered_html, output_path= _render_html(start_date, end_date, risk, time, mean_tickers, factor_tickers, commissions, cash)
+    rendered_html, output_path= _render_html(start_date, end_date, risk, time, mean_tickers, factor_tickers, commissions, cash, market)
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(rendered_html)